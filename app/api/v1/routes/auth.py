@@ -1,34 +1,71 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_session
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, TokenResponse
-from app.db import crud
-from app.db.models import User
-from app.core.security import create_access_token
-from app.core.exceptions import UnauthorizedError
+from app.db import crud, crud_async
+from app.core.security import (
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+)
+from app.core.auth_cache import revocations
+from app.core.auth_dependencies import get_current_user
+from app.core.exceptions import BadRequestError, ServiceUnavailableError, UnauthorizedError
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user.email).first()
+async def register(
+    user: UserCreate,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    # Checked before hashing so duplicate sign-ups never queue on the
+    # bounded hash pool; the unique index still catches a concurrent insert.
+    existing = await crud_async.dispatch(db, crud.get_user_by_email, user.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User already exists",
         )
 
-    return crud.create_user(db, user.email, user.password)
+    hashed = await hash_password_async(user.password)
+    try:
+        return await crud_async.dispatch(db, crud.create_user, user.email, hashed_password=hashed)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already exists",
+        )
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    authenticated = crud.authenticate_user(db, user.email, user.password)
-    if not authenticated:
+async def login(
+    user: UserLogin,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    authenticated = await crud_async.dispatch(db, crud.get_user_by_email, user.email)
+    if not authenticated or not await verify_password_async(
+        user.password, authenticated.hashed_password
+    ):
         raise UnauthorizedError("Invalid credentials")
 
     token = create_access_token(
         {"sub": authenticated.id, "role": authenticated.role}
     )
     return {"access_token": token}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(user: dict = Depends(get_current_user)):
+    # Revokes this token (by jti) for the rest of its lifetime. Tokens
+    # without a jti/exp cannot be revoked individually: say so rather than
+    # answer 204 and leave them valid.
+    if user.get("jti") is None or user.get("exp") is None:
+        raise BadRequestError("Token has no jti and cannot be revoked")
+    try:
+        await revocations.revoke(user)
+    except Exception:
+        raise ServiceUnavailableError("Could not revoke token")
@@ -1,25 +1,54 @@
 from fastapi import (
     APIRouter,
     Depends,
+    Query,
     status,
     Request,
     BackgroundTasks,
 )
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
-
-from app.db.session import get_db
-from app.db import crud
-from app.schemas.items import ItemCreate, ItemUpdate, ItemResponse
+from collections import Counter
+from datetime import datetime, timedelta, UTC
+from typing import Literal
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.session import get_session, session_scope
+from app.db import crud, crud_async
+from app.schemas.items import (
+    ItemCreate,
+    ItemUpdate,
+    ItemResponse,
+    ItemPage,
+    ItemEnrichRequest,
+    ItemBulkUpdate,
+    ItemBulkDelete,
+    ItemFilters,
+)
 from app.core.auth_dependencies import get_current_user, require_role
 from app.core.cache import (
-    cache_get,
-    cache_set,
+    cache_get_or_compute,
+    cache_recent_write,
+    cache_get_key,
+    cache_set_key,
+    cache_delete_key,
+    cache_mark_written,
     cache_invalidate_prefix,
+    item_cache_key,
     safe_cache_call,
 )
+from app.core.config import settings
+from app.core.events import event_hub, publish_item_event, sse_stream
+from app.core.pagination import decode_watermark, encode_watermark
+from app.core.timing import span
 from app.services.external import fetch_quote
-from app.core.exceptions import NotFoundError
+from app.services.export import MEDIA_TYPES, export_items
+from app.services.importer import import_items, stream_text, validation_message
+from app.core.exceptions import BadRequestError, NotFoundError, ResyncRequiredError
 
 
 router = APIRouter(
@@ -31,74 +60,499 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 
+def _json_response(body: bytes | str) -> Response:
+    # Pre-encoded JSON (settings.cache_raw_responses): bypasses json parsing
+    # and response_model validation entirely.
+    return Response(content=body, media_type="application/json")
+
+
 # --------------------
 # LIST ITEMS (cached)
 # --------------------
-@router.get("/", response_model=list[ItemResponse])
+# Passing `cursor` (empty for the first page) switches to keyset pagination
+# and returns an ItemPage with `next_cursor` instead of a bare list.
+@router.get("/", response_model=list[ItemResponse] | ItemPage)
 async def list_items(
     request: Request,
     skip: int = 0,
     limit: int = 10,
     category: str | None = None,
     sort: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    filters: ItemFilters = Depends(),
+):
+    # Runs at most once for concurrent identical misses, on its own session:
+    # the read replica, unless the list was written within its lag window.
+    async def load():
+        async with session_scope(read=not cache_recent_write(request, "items_list")) as db:
+            if cursor is not None:
+                items, next_cursor = await crud_async.dispatch(
+                    db, crud.get_items_page, limit, category, sort, cursor, filters
+                )
+            else:
+                items = await crud_async.dispatch(
+                    db, crud.get_items, skip, limit, category, sort, filters
+                )
+
+        with span("serialize"):
+            payload = [
+                ItemResponse.model_validate(item).model_dump(mode="json")
+                for item in items
+            ]
+            if cursor is not None:
+                payload = {"items": payload, "next_cursor": next_cursor}
+            return orjson.dumps(payload) if raw else payload
+
+    # Concurrent misses for the same query share one DB read (single-flight).
+    raw = settings.cache_raw_responses
+    result = await cache_get_or_compute(request, "items_list", load, raw=raw)
+    return _json_response(result) if raw else result
+
+
+# --------------------
+# BULK CREATE / UPDATE / DELETE
+# --------------------
+# Bodies are JSON arrays, or NDJSON (application/x-ndjson, one object per
+# line) consumed as it streams in. Rows are validated one by one and
+# written settings.bulk_chunk_size at a time, one transaction per chunk;
+# the list cache is invalidated once per request. The response reports
+# every input row by its index; a row repeating a sku/id that a later row
+# in the same chunk (upsert) or request (delete) also names is reported
+# as a DUPLICATE error and the later row wins.
+async def _bulk_rows(request: Request):
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        index = 0
+        buffer = b""
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if buffer.strip():
+            yield index, buffer
+        return
+
+    try:
+        rows = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise BadRequestError("Invalid JSON body")
+    if not isinstance(rows, list):
+        raise BadRequestError("Expected a JSON array or an NDJSON stream")
+    for index, row in enumerate(rows):
+        yield index, row
+
+
+def _bulk_error(index: int, code: str, message: str) -> dict:
+    return {"index": index, "status": "error", "error": {"code": code, "message": message}}
+
+
+def _superseded(index: int, key: str) -> dict:
+    return _bulk_error(index, "DUPLICATE", f"Superseded by a later row with the same {key}")
+
+
+async def _bulk_apply(request: Request, schema, to_row, write_chunk) -> list[dict]:
+    results = []
+    chunk = []
+
+    async def flush():
+        try:
+            results.extend(await write_chunk(chunk))
+        except SQLAlchemyError as e:
+            logger.warning({"bulk": "chunk_failed", "rows": len(chunk), "error": repr(e)})
+            results.extend(
+                _bulk_error(index, "DB_ERROR", "Chunk was rolled back")
+                for index, _ in chunk
+            )
+        chunk.clear()
+
+    async for index, raw in _bulk_rows(request):
+        try:
+            if isinstance(raw, bytes):
+                parsed = schema.model_validate_json(raw)
+            else:
+                parsed = schema.model_validate(raw)
+        except ValidationError as e:
+            results.append(_bulk_error(index, "VALIDATION_ERROR", validation_message(e)))
+            continue
+
+        chunk.append((index, to_row(parsed)))
+        if len(chunk) >= settings.bulk_chunk_size:
+            await flush()
+
+    if chunk:
+        await flush()
+    return results
+
+
+async def _bulk_finish(
+    results: list[dict], changed_ids: list[str], created_ids: list[str] = ()
+) -> dict:
+    if changed_ids:
+        await safe_cache_call(
+            cache_delete_key, *(item_cache_key(item_id) for item_id in changed_ids)
+        )
+    if created_ids:
+        await safe_cache_call(
+            cache_mark_written, *(item_cache_key(item_id) for item_id in created_ids)
+        )
+    if any(r["status"] != "error" for r in results):
+        await safe_cache_call(
+            cache_invalidate_prefix,
+            "items_list",
+        )
+        # One event per batch; subscribers resync from /items/changes.
+        await publish_item_event("bulk")
+
+    results.sort(key=lambda r: r["index"])
+    return {"summary": dict(Counter(r["status"] for r in results)), "results": results}
+
+
+# Upsert on sku: new skus are created, existing ones overwritten.
+@router.post("/bulk")
+async def bulk_upsert_items(
+    request: Request,
+    db: Session | AsyncSession = Depends(get_session),
 ):
-    cached = await safe_cache_call(
-        cache_get,
+    async def write_chunk(chunk):
+        written = await crud_async.dispatch(
+            db, crud.upsert_items, [row for _, row in chunk]
+        )
+        # upsert_items writes each sku once, with its last row.
+        last = {row["sku"]: index for index, row in chunk}
+        results = []
+        for index, row in chunk:
+            if last[row["sku"]] != index:
+                results.append(_superseded(index, "sku"))
+                continue
+            item_id, created = written[row["sku"]]
+            results.append({
+                "index": index,
+                "id": item_id,
+                "sku": row["sku"],
+                "status": "created" if created else "updated",
+            })
+        return results
+
+    results = await _bulk_apply(
+        request, ItemCreate, lambda item: item.model_dump(), write_chunk
+    )
+    updated = [r["id"] for r in results if r["status"] == "updated"]
+    created = [r["id"] for r in results if r["status"] == "created"]
+    return await _bulk_finish(results, updated, created)
+
+
+@router.patch("/bulk")
+async def bulk_update_items(
+    request: Request,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    async def write_chunk(chunk):
+        updated = await crud_async.dispatch(
+            db, crud.update_items, [row for _, row in chunk]
+        )
+        return [
+            {"index": index, "id": row["id"], "status": "updated"}
+            if row["id"] in updated
+            else _bulk_error(index, NotFoundError.code, "Item not found")
+            for index, row in chunk
+        ]
+
+    results = await _bulk_apply(
         request,
-        prefix="items_list",
+        ItemBulkUpdate,
+        lambda item: item.model_dump(exclude_unset=True),
+        write_chunk,
     )
-    if cached is not None:
-        return cached
+    updated = [r["id"] for r in results if r["status"] == "updated"]
+    return await _bulk_finish(results, updated)
 
-    items = crud.get_items(db, skip, limit, category, sort)
 
-    payload = [
-        ItemResponse.model_validate(item).model_dump(mode="json")
-        for item in items
+@router.delete(
+    "/bulk",
+    dependencies=[Depends(require_role("admin"))],
+)
+async def bulk_delete_items(
+    body: ItemBulkDelete,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    last = {item_id: index for index, item_id in enumerate(body.ids)}
+    results = [
+        _superseded(index, "id")
+        for index, item_id in enumerate(body.ids)
+        if last[item_id] != index
     ]
+    ids = list(last)
+    size = settings.bulk_chunk_size
+    for start in range(0, len(ids), size):
+        chunk = ids[start:start + size]
+        deleted = await crud_async.dispatch(db, crud.delete_items, chunk)
+        results.extend(
+            {"index": last[item_id], "id": item_id, "status": "deleted"}
+            if item_id in deleted
+            else _bulk_error(last[item_id], NotFoundError.code, "Item not found")
+            for item_id in chunk
+        )
+
+    deleted = [r["id"] for r in results if r["status"] == "deleted"]
+    return await _bulk_finish(results, deleted)
 
-    await safe_cache_call(
-        cache_set,
-        request,
-        prefix="items_list",
-        payload=payload,
+
+# --------------------
+# IMPORT (CSV / NDJSON upload)
+# --------------------
+# The body is parsed as it arrives, one batch at a time (see
+# services/importer.py), so an upload is never held whole.
+# Same pipeline as the CLI: python -m app.import_items <file>
+@router.post("/import")
+async def import_items_route(
+    request: Request,
+    format: Literal["ndjson", "csv"] | None = None,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    report = await import_items(db, stream_text(request.stream()), format)
+    return report.as_dict()
+
+
+# --------------------
+# EXPORT (streamed)
+# --------------------
+# Whole catalog as NDJSON or CSV, streamed from a server-side cursor;
+# gzipped on the fly when the client accepts it.
+@router.get("/export")
+async def export_items_route(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    category: str | None = None,
+    updated_since: datetime | None = None,
+):
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Content-Disposition": f'attachment; filename="items.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    return StreamingResponse(
+        export_items(format, category, updated_since, compress),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+# --------------------
+# CHANGE FEED
+# --------------------
+# Items updated and deleted since a watermark, oldest first. Pass the
+# returned `watermark` back as `since` (omit it to start from the
+# beginning) and keep calling while `has_more` is true. Apply `updated`
+# as upserts and `deleted` as removals. Deletes are only kept for
+# settings.changes_retention_days: an older watermark gets 410
+# RESYNC_REQUIRED, and the client starts over without `since`.
+@router.get("/changes")
+async def list_changes(
+    since: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session | AsyncSession = Depends(get_session),
+):
+    items_after, deletes_after, synced_at = (
+        decode_watermark(since) if since else (None, None, None)
+    )
+    now = datetime.now(UTC)
+    if since:
+        cutoff = now - timedelta(days=settings.changes_retention_days)
+        if synced_at is None or synced_at.replace(tzinfo=synced_at.tzinfo or UTC) < cutoff:
+            raise ResyncRequiredError(
+                "Watermark is older than the change feed retention; resync from the beginning"
+            )
+    until = now - timedelta(seconds=settings.changes_lag_seconds)
+
+    items, tombstones = await crud_async.dispatch(
+        db, crud.get_changes, items_after, deletes_after, until, limit
+    )
+    has_more = len(items) > limit or len(tombstones) > limit
+    deletes_pending = len(tombstones) > limit
+    items, tombstones = items[:limit], tombstones[:limit]
+
+    if items:
+        items_after = (items[-1].updated_at, items[-1].id)
+    if tombstones:
+        deletes_after = (tombstones[-1].deleted_at, tombstones[-1].id)
+    # Deletes are complete up to `until` unless this page stopped short.
+    synced_at = deletes_after[0] if deletes_pending else until
+
+    return {
+        "updated": [
+            ItemResponse.model_validate(item).model_dump(mode="json") for item in items
+        ],
+        "deleted": [
+            {"id": t.id, "deleted_at": t.deleted_at.isoformat()} for t in tombstones
+        ],
+        "watermark": encode_watermark(items_after, deletes_after, synced_at),
+        "has_more": has_more,
+    }
+
+
+# --------------------
+# EVENTS (server-sent events)
+# --------------------
+# Push channel for item changes: "created", "updated", "deleted" (with id
+# and category) and "bulk". `category` filters per connection.
+@router.get("/events")
+async def item_events(category: str | None = None):
+    return StreamingResponse(
+        sse_stream(event_hub, category),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    return payload
+
+# --------------------
+# SEARCH (full-text, prefix)
+# --------------------
+# Ranked prefix search over sku and name; page with `next_cursor`.
+@router.get("/search", response_model=ItemPage)
+async def search_items(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    items, next_cursor = await crud_async.dispatch(
+        db, crud.search_items, q, limit, cursor
+    )
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # --------------------
-# GET SINGLE ITEM
+# STATS (per-category rollups)
 # --------------------
-@router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: str, db: Session = Depends(get_db)):
-    item = crud.get_item(db, item_id)
+@router.get("/stats")
+async def item_stats(
+    db: Session | AsyncSession = Depends(get_session),
+):
+    threshold = settings.low_stock_threshold
+    rows = await crud_async.dispatch(db, crud.get_category_stats, threshold)
+
+    totals = {"item_count": 0, "total_quantity": 0, "stock_value": 0.0, "low_stock_count": 0}
+    categories = []
+    for row in rows:
+        for key in totals:
+            totals[key] += row[key]
+        categories.append({
+            **row,
+            "category": row["category"] or None,
+            "stock_value": round(row["stock_value"], 2),
+        })
+    totals["stock_value"] = round(totals["stock_value"], 2)
+
+    return {
+        "low_stock_threshold": threshold,
+        "totals": totals,
+        "categories": categories,
+    }
+
+
+# --------------------
+# GET SINGLE ITEM (cached per item_id)
+# --------------------
+async def _item_payload(item_id: str, raw: bool = False):
+    # Read-through cache keyed by item_id; update/delete drop the key and
+    # bump its version, which voids a fill that read the row before them.
+    # Fills read the replica unless the item was written within its window.
+    key = item_cache_key(item_id)
+    cached, version, recent = (
+        await safe_cache_call(cache_get_key, key, raw) or (None, None, False)
+    )
+    if cached is not None:
+        return cached
+
+    async with session_scope(read=not recent) as db:
+        item = await crud_async.dispatch(db, crud.get_item, item_id)
     if not item:
         raise NotFoundError("Item not found")
-    return item
+
+    with span("serialize"):
+        payload = ItemResponse.model_validate(item).model_dump(mode="json")
+        encoded = orjson.dumps(payload)
+    if version is not None:
+        await safe_cache_call(cache_set_key, key, encoded, version)
+    return encoded if raw else payload
+
+
+@router.get("/{item_id}", response_model=ItemResponse)
+async def get_item(item_id: str):
+    if settings.cache_raw_responses:
+        return _json_response(await _item_payload(item_id, raw=True))
+    return await _item_payload(item_id)
 
 
 # --------------------
 # ENRICH ITEM (ASYNC)
 # --------------------
 @router.get("/{item_id}/enrich")
-async def enrich_item(item_id: str, db: Session = Depends(get_db)):
-    item = crud.get_item(db, item_id)
-    if not item:
-        raise NotFoundError("Item not found")
+async def enrich_item(item_id: str):
+    item = await _item_payload(item_id)
 
     quote = await fetch_quote()
 
     return {
-        "item": ItemResponse.model_validate(item).model_dump(mode="json"),
-        "external": {
-            "quote": quote.get("content"),
-            "author": quote.get("author"),
-        },
+        "item": item,
+        "external": _external_payload(quote),
+    }
+
+
+def _external_payload(quote: dict) -> dict:
+    return {
+        "quote": quote.get("content"),
+        "author": quote.get("author"),
+        "degraded": quote.get("degraded", False),
     }
 
 
+def _item_error(item_id: str, code: str, message: str) -> dict:
+    return {"item_id": item_id, "error": {"code": code, "message": message}}
+
+
+# --------------------
+# ENRICH ITEMS (BATCH)
+# --------------------
+# One IN query for all items and one fetch_quote for the batch: the quote
+# is shared process-wide (see app/services/external.py) and degrades
+# instead of raising, so every found item gets the same one. Missing items
+# come back as per-item errors; the batch still succeeds.
+@router.post("/enrich")
+async def enrich_items(
+    body: ItemEnrichRequest,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    item_ids = list(dict.fromkeys(body.item_ids))
+    if len(item_ids) > settings.enrich_batch_max_items:
+        raise BadRequestError(
+            f"At most {settings.enrich_batch_max_items} items per batch"
+        )
+
+    items = await crud_async.dispatch(db, crud.get_items_by_ids, item_ids)
+    by_id = {item.id: item for item in items}
+    external = _external_payload(await fetch_quote()) if by_id else None
+
+    results = [
+        {
+            "item_id": item_id,
+            "item": ItemResponse.model_validate(by_id[item_id]).model_dump(mode="json"),
+            "external": external,
+        }
+        if item_id in by_id
+        else _item_error(item_id, NotFoundError.code, "Item not found")
+        for item_id in item_ids
+    ]
+    return {"results": results}
+
+
 # --------------------
 # UPDATE ITEM
 # --------------------
@@ -106,18 +560,21 @@ async def enrich_item(item_id: str, db: Session = Depends(get_db)):
 async def update_item(
     item_id: str,
     updates: ItemUpdate,
-    db: Session = Depends(get_db),
+    db: Session | AsyncSession = Depends(get_session),
 ):
-    item = crud.get_item(db, item_id)
+    item = await crud_async.dispatch(db, crud.get_item, item_id)
     if not item:
         raise NotFoundError("Item not found")
+    previous_category = item.category
 
-    updated = crud.update_item(db, item, updates)
+    updated = await crud_async.dispatch(db, crud.update_item, item, updates)
 
+    await safe_cache_call(cache_delete_key, item_cache_key(item_id))
     await safe_cache_call(
         cache_invalidate_prefix,
         "items_list",
     )
+    await publish_item_event("updated", item_id, updated.category, previous_category)
 
     return updated
 
@@ -130,17 +587,23 @@ async def update_item(
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_role("admin"))],
 )
-async def delete_item(item_id: str, db: Session = Depends(get_db)):
-    item = crud.get_item(db, item_id)
+async def delete_item(
+    item_id: str,
+    db: Session | AsyncSession = Depends(get_session),
+):
+    item = await crud_async.dispatch(db, crud.get_item, item_id)
     if not item:
         raise NotFoundError("Item not found")
 
-    crud.delete_item(db, item)
+    category = item.category
+    await crud_async.dispatch(db, crud.delete_item, item)
 
+    await safe_cache_call(cache_delete_key, item_cache_key(item_id))
     await safe_cache_call(
         cache_invalidate_prefix,
         "items_list",
     )
+    await publish_item_event("deleted", item_id, category)
 
 
 # --------------------
@@ -154,9 +617,9 @@ def audit_log(event: str, item_id: str):
 async def create_item(
     item: ItemCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: Session | AsyncSession = Depends(get_session),
 ):
-    created = crud.create_item(db, item)
+    created = await crud_async.dispatch(db, crud.create_item, item)
 
     background_tasks.add_task(
         audit_log,
@@ -164,9 +627,11 @@ async def create_item(
         str(created.id),
     )
 
+    await safe_cache_call(cache_mark_written, item_cache_key(str(created.id)))
     await safe_cache_call(
         cache_invalidate_prefix,
         "items_list",
     )
+    await publish_item_event("created", str(created.id), created.category)
 
     return created
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.redis_client import init_redis
+
+logger = logging.getLogger(__name__)
+
+# Revoked token ids (jti) live in one Redis zset scored by the token's exp,
+# so the denylist only ever holds tokens that would otherwise still be valid.
+REVOKED_KEY = "auth:revoked"
+
+
+class TokenCache:
+    # Verified token payloads keyed by sha256(token), dropped at the token's
+    # exp. A hit skips the HMAC check and claims parsing entirely.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        payload = self._entries.get(key)
+        if payload is None:
+            return None
+        if payload.get("exp", 0) <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RevocationList:
+    # Local copy of the Redis denylist, refreshed in one ZRANGE per sync
+    # interval; per-request checks are a dict lookup. Revocations made by
+    # this worker apply immediately, others within one interval.
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+
+    def is_revoked(self, payload: dict) -> bool:
+        jti = payload.get("jti")
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, exp: float) -> None:
+        self._revoked[jti] = exp
+
+    async def revoke(self, payload: dict) -> None:
+        jti, exp = payload.get("jti"), payload.get("exp")
+        if jti is None or exp is None:
+            return
+        self.add(jti, exp)
+        r = await init_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.zadd(REVOKED_KEY, {jti: exp})
+            pipe.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+            await pipe.execute()
+
+    async def sync(self) -> None:
+        r = await init_redis()
+        now = time.time()
+        entries = await r.zrangebyscore(REVOKED_KEY, now, "+inf", withscores=True)
+        # Revocations are never undone: merge, and drop only expired ones.
+        revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        revoked.update(entries)
+        self._revoked = revoked
+
+    def clear(self) -> None:
+        self._revoked.clear()
+
+
+token_cache = TokenCache(settings.auth_token_cache_size)
+revocations = RevocationList()
+_sync_task: asyncio.Task | None = None
+
+
+async def _sync_loop() -> None:
+    healthy = True
+    while True:
+        try:
+            await revocations.sync()
+            healthy = True
+        except Exception as e:
+            # Keep serving the last snapshot.
+            if healthy:
+                logger.warning("Token revocation sync failed", exc_info=e)
+            healthy = False
+        await asyncio.sleep(settings.auth_revocation_sync_seconds)
+
+
+def start_revocation_sync() -> None:
+    global _sync_task
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_revocation_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
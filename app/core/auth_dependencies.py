@@ -1,22 +1,35 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.auth_cache import revocations, token_cache
 from app.core.security import decode_token
 from app.core.exceptions import ForbiddenError
 
 security = HTTPBearer()
 
 
-def get_current_user(
+# async: runs on the event loop, not a threadpool hop. Repeat tokens are a
+# cache lookup; only the first request per token pays for jwt.decode.
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
-    try:
-        payload = decode_token(credentials.credentials)
-        return payload
-    except Exception:
+    token = credentials.credentials
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = decode_token(token)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+            )
+        token_cache.set(token, payload)
+
+    if revocations.is_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
+            detail="Token has been revoked",
         )
+    return payload
 
 
 def require_role(required_role: str):
@@ -1,11 +1,52 @@
+import asyncio
 import hashlib
-import json
+import uuid
+import orjson
 from fastapi import Request
 from app.core.config import settings
 from app.core.redis_client import init_redis
-from typing import Any
+from app.core.local_cache import local_cache
+from app.core.metrics import CACHE_REQUESTS, observe_redis
+from app.core.timing import span
+from typing import Any, Awaitable, Callable
 import logging
 
+# Cache entries are namespaced by a per-prefix generation counter:
+#   cache:{prefix}:gen               -> current generation (INCR'd on writes)
+#   cache:{prefix}:{gen}:{digest}    -> cached payload (expires via TTL)
+# Invalidation bumps the counter in one round trip; entries of older
+# generations are never read again and simply age out.
+#
+# With settings.local_cache_enabled an in-process LRU (app/core/local_cache.py)
+# sits in front of Redis; invalidations are published on INVALIDATION_CHANNEL
+# so every worker drops its local copies of the prefix.
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+logger = logging.getLogger(__name__)
+
+# Reads the current generation, the entry under it and the recent-write
+# marker in one round trip.
+_GET_SCRIPT = """
+local gen = redis.call('GET', KEYS[1]) or '0'
+return {gen, redis.call('GET', ARGV[1] .. gen .. ':' .. ARGV[2]), redis.call('EXISTS', KEYS[2])}
+"""
+
+# Single-flight across processes: take the recompute lock, or hand back the
+# stale copy of the previous value if someone else holds it.
+_LOCK_OR_STALE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return {1, false}
+end
+return {0, redis.call('GET', KEYS[2])}
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 def _cache_key_from_request(request: Request, prefix: str) -> str:
     # include path + query params + (optionally) user identity
@@ -14,35 +55,367 @@ def _cache_key_from_request(request: Request, prefix: str) -> str:
     return f"cache:{prefix}:{digest}"
 
 
-async def cache_get(request: Request, prefix: str) -> Any | None:
-    r = await init_redis()
+def _generation_key(prefix: str) -> str:
+    return f"cache:{prefix}:gen"
+
+
+# With a read replica, writers also set {key}:recent for
+# settings.read_replica_window_seconds; fills that see it read the primary.
+def _recent_key(key: str) -> str:
+    return f"{key}:recent"
+
+
+def _replica_configured() -> bool:
+    return bool(settings.read_database_url or settings.async_read_database_url)
+
+
+def _versioned_key(prefix: str, generation: str, key: str) -> str:
+    # key is cache:{prefix}:{digest} as built by _cache_key_from_request
+    digest = key.rsplit(":", 1)[1]
+    return f"cache:{prefix}:{generation}:{digest}"
+
+
+def _encode(payload: Any) -> bytes | str:
+    # Pre-encoded payloads (raw mode) are stored as-is.
+    if isinstance(payload, (bytes, str)):
+        return payload
+    return orjson.dumps(payload)
+
+
+def _decode(val: bytes | str, raw: bool) -> Any:
+    # raw=True hands back the stored JSON text without parsing it, for
+    # routes that return it directly as the response body.
+    return val if raw else orjson.loads(val)
+
+
+def _local_key(key: str) -> str:
+    # cache:{prefix}:{digest} -> {prefix}:{digest}
+    return key.split(":", 1)[1]
+
+
+def _request_memo(request: Request, name: str) -> dict:
+    # cache_set writes under the generation (and local epoch) seen by
+    # cache_get, so a result computed before an invalidation can never land
+    # in the new generation.
+    memo = getattr(request.state, name, None)
+    if memo is None:
+        memo = {}
+        setattr(request.state, name, memo)
+    return memo
+
+
+async def cache_get(request: Request, prefix: str, raw: bool = False) -> Any | None:
     key = _cache_key_from_request(request, prefix)
-    val = await r.get(key)
+
+    if settings.local_cache_enabled:
+        epoch = local_cache.epoch(prefix)
+        _request_memo(request, "local_cache_epochs")[prefix] = epoch
+        cached = local_cache.get(_local_key(key))
+        if cached is not None:
+            CACHE_REQUESTS.labels(prefix, "local_hit").inc()
+            return cached
+
+    r = await init_redis()
+    get_script = r.register_script(_GET_SCRIPT)  # EVALSHA, loads on first miss
+    generation, val, recent = await get_script(
+        keys=[_generation_key(prefix), _recent_key(f"cache:{prefix}")],
+        args=[f"cache:{prefix}:", key.rsplit(":", 1)[1]],
+    )
+    _request_memo(request, "cache_generations")[prefix] = generation
+    _request_memo(request, "cache_recent_writes")[prefix] = bool(recent)
+    CACHE_REQUESTS.labels(prefix, "hit" if val else "miss").inc()
     if val:
-        return json.loads(val)
+        payload = _decode(val, raw)
+        if settings.local_cache_enabled:
+            local_cache.set(prefix, _local_key(key), payload, len(val), epoch)
+        return payload
     return None
 
 
 async def cache_set(request: Request, prefix: str, payload: Any) -> None:
     r = await init_redis()
     key = _cache_key_from_request(request, prefix)
-    await r.setex(key, settings.cache_ttl_seconds, json.dumps(payload))
+    generation = _request_memo(request, "cache_generations").get(prefix)
+    if generation is None:
+        generation = await r.get(_generation_key(prefix)) or "0"
+    serialized = _encode(payload)
+    versioned = _versioned_key(prefix, generation, key)
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.setex(versioned, settings.cache_ttl_seconds, serialized)
+        # Longer-lived copy served while another process recomputes.
+        pipe.setex(f"{versioned}:stale", settings.cache_stale_ttl_seconds, serialized)
+        await pipe.execute()
+
+    if settings.local_cache_enabled:
+        epoch = _request_memo(request, "local_cache_epochs").get(prefix)
+        local_cache.set(prefix, _local_key(key), payload, len(serialized), epoch)
 
 
 async def cache_invalidate_prefix(prefix: str) -> None:
-    # Simple invalidation: delete all keys for prefix (fine for small projects)
+    # O(1): bump the generation instead of scanning and deleting keys, and
+    # tell every worker to drop its local copies in the same round trip.
+    _local_generations[prefix] = _local_generations.get(prefix, 0) + 1
+    if settings.local_cache_enabled:
+        local_cache.invalidate_prefix(prefix)
+
+    r = await init_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        # Marker first: whoever sees the new generation also sees it.
+        if _replica_configured():
+            pipe.set(
+                _recent_key(f"cache:{prefix}"), 1,
+                px=int(settings.read_replica_window_seconds * 1000),
+            )
+        pipe.incr(_generation_key(prefix))
+        pipe.publish(INVALIDATION_CHANNEL, prefix)
+        await pipe.execute()
+
+
+def cache_recent_write(request: Request, prefix: str) -> bool:
+    # Whether cache_get saw a write to prefix within the replica window; a
+    # fill should then read the primary.
+    return _request_memo(request, "cache_recent_writes").get(prefix, False)
+
+
+# --------------------
+# Per-key entries (e.g. single items), invalidated precisely
+# --------------------
+# Each key has a version counter ({key}:ver). Writers bump it and drop the
+# entry; a reader stores what it loaded only if the version it saw before
+# its DB read is still current, so a read that raced a write can never put
+# the old row back.
+_VERSION_TTL_SECONDS = 86400  # far longer than any read; expiry only skips a fill
+
+# Returns {version, payload, recent-write marker} in one round trip.
+_GET_KEY_SCRIPT = """
+return {redis.call('GET', KEYS[1]) or '0', redis.call('GET', KEYS[2]), redis.call('EXISTS', KEYS[3])}
+"""
+
+# Compare-and-set on the version read by _GET_KEY_SCRIPT.
+_SET_KEY_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+
+def item_cache_key(item_id: str) -> str:
+    return f"cache:item:{item_id}"
+
+
+def _version_key(key: str) -> str:
+    return f"{key}:ver"
+
+
+async def cache_get_key(key: str, raw: bool = False) -> tuple[Any | None, str, bool]:
+    # Returns (payload or None, version, recently written); pass the version
+    # to cache_set_key, and fill from the primary if recently written.
+    r = await init_redis()
+    get_script = r.register_script(_GET_KEY_SCRIPT)
+    version, val, recent = await get_script(keys=[_version_key(key), key, _recent_key(key)])
+    CACHE_REQUESTS.labels(key.split(":")[1], "hit" if val else "miss").inc()
+    return (_decode(val, raw) if val else None), version, bool(recent)
+
+
+async def cache_set_key(key: str, payload: Any, version: str) -> bool:
+    r = await init_redis()
+    set_script = r.register_script(_SET_KEY_SCRIPT)
+    stored = await set_script(
+        keys=[_version_key(key), key],
+        args=[version, settings.cache_ttl_seconds, _encode(payload)],
+    )
+    return bool(stored)
+
+
+async def cache_delete_key(*keys: str) -> None:
+    if not keys:
+        return
+    r = await init_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for key in keys:
+            if _replica_configured():
+                pipe.set(
+                    _recent_key(key), 1,
+                    px=int(settings.read_replica_window_seconds * 1000),
+                )
+            pipe.incr(_version_key(key))
+            pipe.expire(_version_key(key), _VERSION_TTL_SECONDS)
+        pipe.delete(*keys)
+        await pipe.execute()
+
+
+async def cache_mark_written(*keys: str) -> None:
+    # For keys with nothing cached yet (new items): only the recent-write
+    # marker, so a fill inside the replica window reads the primary
+    # instead of 404ing on a replica that has not caught up.
+    if not keys or not _replica_configured():
+        return
     r = await init_redis()
-    pattern = f"cache:{prefix}:*"
-    async for k in r.scan_iter(match=pattern):
-        await r.delete(k)
+    async with r.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.set(
+                _recent_key(key), 1,
+                px=int(settings.read_replica_window_seconds * 1000),
+            )
+        await pipe.execute()
+
+
+# --------------------
+# Single-flight misses
+# --------------------
+_inflight: dict[str, asyncio.Task] = {}
+# Invalidations made by this process, counted even when Redis is down.
+_local_generations: dict[str, int] = {}
+
+
+async def cache_get_or_compute(
+    request: Request,
+    prefix: str,
+    compute: Callable[[], Awaitable[Any]],
+    raw: bool = False,
+) -> Any:
+    # Read-through with stampede protection. Within a process, concurrent
+    # misses for the same key await one computation; across processes, the
+    # first miss takes a short Redis lock and the others serve the stale
+    # copy of the previous value (or wait briefly for the fresh one).
+    # With raw=True, compute returns encoded JSON and hits return it unparsed.
+    # compute is shared by every waiter, so it must not use any one
+    # request's resources (e.g. its DB session).
+    cached = await safe_cache_call(cache_get, request, prefix, raw)
+    if cached is not None:
+        return cached
+
+    # Only requests that saw the same generation share a computation: one
+    # arriving after a write must not get a result read before it.
+    key = _cache_key_from_request(request, prefix)
+    generation = _request_memo(request, "cache_generations").get(prefix)
+    inflight_key = (
+        f"{_versioned_key(prefix, generation, key) if generation is not None else key}"
+        f"@{_local_generations.get(prefix, 0)}"
+    )
+    task = _inflight.get(inflight_key)
+    if task is None:
+        task = asyncio.ensure_future(_fill(request, prefix, key, compute, raw))
+        _inflight[inflight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+    # shield: one cancelled request must not cancel the shared computation
+    return await asyncio.shield(task)
+
+
+async def _fill(
+    request: Request,
+    prefix: str,
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    raw: bool,
+) -> Any:
+    generation = _request_memo(request, "cache_generations").get(prefix)
+    if generation is None:
+        # Redis was unreachable in cache_get: no distributed coordination.
+        return await compute()
+
+    versioned = _versioned_key(prefix, generation, key)
+    lock_key = f"{versioned}:lock"
+    token = uuid.uuid4().hex
+
+    try:
+        r = await init_redis()
+        lock_or_stale = r.register_script(_LOCK_OR_STALE_SCRIPT)
+        acquired, stale = await lock_or_stale(
+            keys=[lock_key, f"{versioned}:stale"],
+            args=[token, settings.cache_lock_ttl_ms],
+        )
+    except Exception as e:
+        logger.warning("Cache unavailable", exc_info=e)
+        return await compute()
+
+    if not acquired:
+        if stale:
+            CACHE_REQUESTS.labels(prefix, "stale").inc()
+            return _decode(stale, raw)
+        # Nothing to serve yet: give the lock holder a chance to publish.
+        fresh = await _wait_for_fill(request, prefix, raw)
+        if fresh is not None:
+            return fresh
+
+    try:
+        payload = await compute()
+        await safe_cache_call(cache_set, request, prefix, payload)
+        return payload
+    finally:
+        if acquired:
+            release = r.register_script(_RELEASE_SCRIPT)
+            await safe_cache_call(release, keys=[lock_key], args=[token])
+
+
+async def _wait_for_fill(request: Request, prefix: str, raw: bool) -> Any | None:
+    deadline = asyncio.get_running_loop().time() + settings.cache_lock_ttl_ms / 1000
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.05)
+        cached = await safe_cache_call(cache_get, request, prefix, raw)
+        if cached is not None:
+            return cached
+    return None
+
+
+# --------------------
+# Local tier coherence (pub/sub listener, one per worker)
+# --------------------
+_listener_task: asyncio.Task | None = None
+
+
+async def _listen_for_invalidations() -> None:
+    backoff = 1.0
+    while True:
+        pubsub = None
+        try:
+            r = await init_redis()
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Anything published while we were not subscribed is lost.
+            local_cache.clear()
+            backoff = 1.0
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    local_cache.invalidate_prefix(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener disconnected", exc_info=e)
+            local_cache.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+
+def start_cache_listener() -> None:
+    global _listener_task
+    if settings.local_cache_enabled and _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_cache_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
 
 
 #AI provided to address remote Redis availability and timeouts.ChaptGPT
-logger = logging.getLogger(__name__)
 
 async def safe_cache_call(fn, *args, **kwargs):
     try:
-        return await fn(*args, **kwargs)
+        with span("cache"), observe_redis(getattr(fn, "__name__", "script")):
+            return await fn(*args, **kwargs)
     except Exception as e:
         logger.warning("Cache unavailable", exc_info=e)
-        return None
\ No newline at end of file
+        return None
@@ -6,6 +6,34 @@ class Settings(BaseSettings):
     environment: str = "development"
 
     database_url: str = "sqlite:///./inventory.db"
+    # Async DB layer (AsyncSession). When async_database_url is unset it is
+    # derived from database_url (sqlite -> aiosqlite, postgresql -> asyncpg).
+    db_async: bool = False
+    async_database_url: str | None = None
+    # Optional read-only replica for list_items/get_item cache fills (async
+    # URL derived the same way). For read_replica_window_seconds after a
+    # write the affected fills read the primary instead, so a lagging
+    # replica cannot put old rows back in the cache; keep it above the
+    # replica's worst lag.
+    read_database_url: str | None = None
+    async_read_database_url: str | None = None
+    read_replica_window_seconds: float = 5.0
+
+    # Connection pool (server databases; SQLite keeps SQLAlchemy's defaults)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800  # seconds; -1 disables
+    db_pool_pre_ping: bool = True
+
+    # SQLite pragmas applied to every new connection. WAL lets readers run
+    # alongside a writer; busy_timeout waits for the write lock instead of
+    # failing with "database is locked"
+    sqlite_wal: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456  # bytes; 0 disables
     redis_url: str = "redis://localhost:6379/0"
     
     model_config = SettingsConfigDict(env_file=".env")    
@@ -15,9 +43,98 @@ class Settings(BaseSettings):
     # Rate limiting
     rate_limit_requests: int = 60
     rate_limit_window_seconds: int = 60
+    # "sliding_window" (exact, one zset entry per request) or "gcra"
+    # (token bucket, O(1) memory per client)
+    rate_limit_algorithm: str = "sliding_window"
+    # "redis": one script call per request. "local": per-worker token
+    # buckets only. "hybrid": local buckets reconciled with Redis every
+    # rate_limit_sync_interval_ms.
+    rate_limit_mode: str = "redis"
+    rate_limit_sync_interval_ms: int = 1000
+    # When Redis is unreachable: admit (True) or answer 503 (False)
+    rate_limit_fail_open: bool = True
 
     # Cache
     cache_ttl_seconds: int = 20
+    # Return cached JSON bytes as-is (no json parse / response_model pass)
+    cache_raw_responses: bool = False
+
+    # Optional per-worker in-memory tier in front of the Redis cache, kept
+    # coherent through Redis pub/sub invalidation messages.
+    local_cache_enabled: bool = False
+    local_cache_max_entries: int = 1024
+    local_cache_max_bytes: int = 16 * 1024 * 1024
+    local_cache_ttl_seconds: float = 5.0
+
+    # Stampede protection: a miss takes a short Redis lock to recompute,
+    # other processes serve the previous ("stale") value meanwhile.
+    cache_lock_ttl_ms: int = 5000
+    cache_stale_ttl_seconds: int = 120
+
+    # External quote provider (enrich_item)
+    external_quote_url: str = "https://api.quotable.io/random"
+    external_timeout_seconds: float = 2.0
+    external_connect_timeout_seconds: float = 1.0
+    external_max_connections: int = 20
+    external_http2: bool = True
+    external_cache_ttl_seconds: float = 10.0
+    external_breaker_failures: int = 5
+    external_breaker_reset_seconds: float = 30.0
+    # Batch enrich: max items per request
+    enrich_batch_max_items: int = 100
+
+    # Bulk item endpoints: rows per transaction (and per upsert/update call)
+    bulk_chunk_size: int = 500
+
+    # Export: rows fetched per server-side cursor batch, gzip level (1-9)
+    export_batch_size: int = 1000
+    export_gzip_level: int = 6
+
+    # Import (upload endpoint and app/import_items.py CLI)
+    import_batch_size: int = 1000
+    import_max_errors: int = 100  # rejected rows listed in the report
+
+    # Change feed: rows newer than this are held back until concurrent
+    # transactions with earlier timestamps have had time to commit.
+    changes_lag_seconds: float = 2.0
+    # Tombstones of deleted items are kept this long; a watermark older than
+    # that may have missed deletes and is refused (RESYNC_REQUIRED).
+    changes_retention_days: float = 7.0
+
+    # Item change push (SSE): buffered events per client before it is
+    # dropped as too slow, and idle keepalive interval
+    events_queue_size: int = 100
+    events_heartbeat_seconds: float = 15.0
+
+    # Inventory stats: items with quantity <= this count as low stock
+    low_stock_threshold: int = 5
+
+    # Auth: verified-token LRU (0 disables) and how often each worker pulls
+    # the revoked-token list from Redis
+    auth_token_cache_size: int = 10_000
+    auth_revocation_sync_seconds: float = 5.0
+
+    # Request timing: Server-Timing header on every response, and requests
+    # slower than slow_request_ms (0 disables) are logged with their span
+    # tree and SQL; the last slow_request_samples are kept by request_id
+    server_timing_enabled: bool = True
+    slow_request_ms: float = 1000.0
+    slow_request_samples: int = 100
+
+    # SQL instrumentation: statements slower than slow_query_ms (0 disables)
+    # are logged with their EXPLAIN plan; one statement run this many times
+    # in a single request is logged as a likely N+1 (0 disables)
+    slow_query_ms: float = 200.0
+    repeated_query_threshold: int = 10
+
+    # /metrics exposes route names and traffic volumes, so it answers 404
+    # until metrics_token is set; scrapes then send
+    # "Authorization: Bearer <metrics_token>".
+    metrics_token: str | None = None
+
+    # Password hashing pool (bcrypt runs off the event loop, bounded)
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
 
    
 
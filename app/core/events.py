@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import orjson
+from app.core.config import settings
+from app.core.metrics import observe_redis
+from app.core.redis_client import init_redis
+
+# Item change events. Routes publish on EVENTS_CHANNEL; every worker keeps a
+# single subscription and fans messages out to its own SSE clients, each
+# with a bounded queue. A client whose queue fills up is dropped (it gets a
+# final "dropped" event and should reconnect / resync via /items/changes).
+EVENTS_CHANNEL = "items:events"
+
+logger = logging.getLogger(__name__)
+
+
+async def publish_item_event(
+    op: str,
+    item_id: str | None = None,
+    category: str | None = None,
+    previous_category: str | None = None,
+) -> None:
+    # Best effort: the write has already committed, and subscribers that
+    # miss an event catch up through /items/changes.
+    event = {"op": op, "id": item_id, "category": category}
+    if previous_category is not None and previous_category != category:
+        event["previous_category"] = previous_category
+    try:
+        with observe_redis("publish_item_event"):
+            r = await init_redis()
+            await r.publish(EVENTS_CHANNEL, orjson.dumps(event))
+    except Exception as e:
+        logger.warning({"events": "publish_failed", "op": op, "id": item_id}, exc_info=e)
+
+
+class Subscriber:
+    def __init__(self, category: str | None, max_queue: int):
+        self.category = category
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_queue)
+
+    def wants(self, event: dict) -> bool:
+        # Events without a category (bulk changes) go to everyone.
+        if self.category is None or event.get("category") is None:
+            return True
+        return self.category in (event["category"], event.get("previous_category"))
+
+    def offer(self, raw: bytes) -> bool:
+        try:
+            self.queue.put_nowait(raw)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self) -> None:
+        # Free the backlog and leave only the end-of-stream marker.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    def __init__(self):
+        self._subscribers: set[Subscriber] = set()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, category: str | None = None) -> Subscriber:
+        subscriber = Subscriber(category, settings.events_queue_size)
+        self._subscribers.add(subscriber)
+        # The Redis subscription only exists while someone is listening.
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def dispatch(self, raw: bytes | str) -> None:
+        try:
+            event = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return
+        if isinstance(raw, str):
+            raw = raw.encode()
+        for subscriber in list(self._subscribers):
+            if subscriber.wants(event) and not subscriber.offer(raw):
+                logger.warning({"events": "slow_consumer_dropped", "category": subscriber.category})
+                self._subscribers.discard(subscriber)
+                subscriber.drop()
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                r = await init_redis()
+                pubsub = r.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Item event listener disconnected", exc_info=e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    await pubsub.aclose()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in list(self._subscribers):
+            subscriber.drop()
+        self._subscribers.clear()
+
+
+event_hub = EventHub()
+
+
+async def sse_stream(hub: EventHub, category: str | None = None):
+    # text/event-stream body; comments keep idle connections (and proxies)
+    # from timing out.
+    subscriber = hub.subscribe(category)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                raw = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.events_heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if raw is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield b"event: item\ndata: " + raw + b"\n\n"
+    finally:
+        hub.unsubscribe(subscriber)
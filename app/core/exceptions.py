@@ -26,4 +26,14 @@ class ForbiddenError(AppException):
 
 class BadRequestError(AppException):
     code = "BAD_REQUEST"
-    status_code = 400
\ No newline at end of file
+    status_code = 400
+
+
+class ResyncRequiredError(AppException):
+    code = "RESYNC_REQUIRED"
+    status_code = 410
+
+
+class ServiceUnavailableError(AppException):
+    code = "SERVICE_UNAVAILABLE"
+    status_code = 503
\ No newline at end of file
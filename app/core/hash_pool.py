@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import (
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    submitted: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class PasswordHashPool:
+    # bcrypt releases the GIL while hashing, so a small dedicated thread pool
+    # gets real parallelism without tying up the shared anyio threadpool that
+    # the sync DB layer uses. Callers beyond workers + max_queue get a 503
+    # instead of piling up behind a login storm.
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stats = PoolStats()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+    def _observe_wait(self, waited: float) -> None:
+        PASSWORD_HASH_WAIT.observe(waited)
+        with self._lock:
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+    def _release(self, _future) -> None:
+        # Runs when the job itself finishes (or is dropped from the queue),
+        # not when its caller stops waiting: a cancelled request's hash
+        # keeps a worker busy until it completes.
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+
+    async def run(self, fn: Callable, *args: Any):
+        with self._lock:
+            full = self._pending >= self.workers + self.max_queue
+            if not full:
+                self._pending += 1
+        if full:
+            self.stats.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            logger.warning({"password_pool": "rejected", "pending": self._pending})
+            raise ServiceUnavailableError("Authentication is busy, please retry")
+
+        self.stats.submitted += 1
+        PASSWORD_HASH_PENDING.inc()
+        submitted_at = time.perf_counter()
+
+        def task():
+            self._observe_wait(time.perf_counter() - submitted_at)
+            return fn(*args)
+
+        try:
+            future = self._get_executor().submit(task)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHashPool(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+class LocalCache:
+    # Per-worker LRU/TTL tier in front of Redis, bounded by entry count and
+    # by the serialized size of the cached payloads. Keys are
+    # "{prefix}:{digest}" so a whole prefix can be dropped on invalidation.
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        # Bumped on every invalidation of a prefix; a value computed under an
+        # older epoch is not stored (it may predate the invalidation).
+        self._epochs: dict[str, int] = {}
+        self._global_epoch = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def epoch(self, prefix: str) -> int:
+        return self._global_epoch + self._epochs.get(prefix, 0)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, prefix: str, key: str, value: Any, size: int, epoch: int | None = None) -> None:
+        if epoch is not None and epoch != self.epoch(prefix):
+            return
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        self._epochs[prefix] = self._epochs.get(prefix, 0) + 1
+        marker = f"{prefix}:"
+        for key in [k for k in self._entries if k.startswith(marker)]:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._global_epoch += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+local_cache = LocalCache(
+    max_entries=settings.local_cache_max_entries,
+    max_bytes=settings.local_cache_max_bytes,
+    ttl_seconds=settings.local_cache_ttl_seconds,
+)
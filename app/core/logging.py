@@ -1,5 +1,7 @@
 import logging
 import sys
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 def setup_logging(log_level: str):
@@ -10,4 +12,38 @@ def setup_logging(log_level: str):
     )
 
     # Reduce noisy logs
-    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
\ No newline at end of file
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+# One structured log line per request. Pure ASGI, like the other middlewares.
+class AccessLogMiddleware:
+    def __init__(self, app: ASGIApp, logger: logging.Logger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_with_status)
+        duration = time.perf_counter() - start_time
+
+        self.logger.info(
+            {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "request_id": scope.get("state", {}).get("request_id"),
+            }
+        )
@@ -0,0 +1,147 @@
+import hmac
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Prometheus metrics. With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR
+# (an empty directory shared by the workers) and every worker's samples are
+# aggregated on scrape; otherwise the default in-process registry is used.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency (count = number of queries)",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by prefix and result (hit, local_hit, stale, miss)",
+    ["prefix", "result"],
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limiter outcomes (allowed, limited, unavailable)",
+    ["decision"],
+)
+REDIS_CALL_DURATION = Histogram(
+    "redis_call_duration_seconds",
+    "Latency of Redis-backed operations",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_wait_seconds",
+    "Time password hashing jobs queued before a worker picked them up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Password hashing jobs running or queued",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hashing jobs refused because the pool was full",
+)
+
+
+@contextmanager
+def observe_redis(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REDIS_CALL_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+
+def mark_process_dead() -> None:
+    # Drops this worker's live gauges from the shared directory on shutdown.
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if not settings.metrics_token:
+        return Response(status_code=404)  # not served until a token is set
+    if not hmac.compare_digest(
+        request.headers.get("authorization", "").encode(),
+        f"Bearer {settings.metrics_token}".encode(),
+    ):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # scope["route"] is the APIRoute as declared on its router, without the
+    # include_router prefix; FastAPI's effective route carries the full one.
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(effective, "path_format", None) or route.path_format
+
+
+# Pure ASGI, like the other middlewares. Labels use the matched route
+# template (/v1/items/{item_id}), never the raw path, to bound cardinality.
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method, _route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from app.core.exceptions import BadRequestError
+
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+# Cursors are opaque to clients: base64url(JSON) of the sort spec plus the
+# (value, id) of the last row on the page.
+def encode_cursor(sort: str | None, value: Any, item_id: str) -> str:
+    return _encode({"s": sort, "v": _encode_value(value), "id": item_id})
+
+
+def decode_cursor(cursor: str, sort: str | None) -> tuple[Any, str]:
+    try:
+        data = _decode(cursor)
+        value, item_id = _decode_value(data["v"]), data["id"]
+    except Exception:
+        raise BadRequestError("Invalid cursor")
+
+    if data.get("s") != sort:
+        raise BadRequestError("Cursor does not match the requested sort")
+
+    return value, str(item_id)
+
+
+# Change-feed watermarks: the last (timestamp, id) seen in each of the two
+# streams, items by updated_at and tombstones by deleted_at. None means
+# "from the beginning". synced_at: every delete up to then was delivered
+# (None in watermarks issued before it was recorded).
+Position = tuple[datetime, str] | None
+
+
+def encode_watermark(items: Position, deletes: Position, synced_at: datetime) -> str:
+    return _encode({
+        "i": [_encode_value(items[0]), items[1]] if items else None,
+        "d": [_encode_value(deletes[0]), deletes[1]] if deletes else None,
+        "t": _encode_value(synced_at),
+    })
+
+
+def decode_watermark(token: str) -> tuple[Position, Position, datetime | None]:
+    try:
+        data = _decode(token)
+        positions = []
+        for stream in ("i", "d"):
+            pos = data[stream]
+            positions.append((_decode_value(pos[0]), str(pos[1])) if pos else None)
+        synced_at = _decode_value(data["t"]) if data.get("t") else None
+    except Exception:
+        raise BadRequestError("Invalid watermark")
+    return positions[0], positions[1], synced_at
@@ -1,10 +1,19 @@
+import asyncio
+import logging
+import math
 import time
+import uuid
 from dataclasses import dataclass
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_DECISIONS, observe_redis
 from app.core.redis_client import init_redis
+from app.core.timing import span
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -21,45 +30,276 @@ def _client_key(request: Request) -> str:
     return ip
 
 
-async def check_rate_limit(key: str, limit: int, window_seconds: int) -> RateLimitResult:
+# Both algorithms run as one server-side script (a single EVALSHA round trip)
+# using the Redis clock, so every worker agrees on "now". Each returns
+# {allowed, remaining, reset_ms}; reset_ms is when the next slot frees up.
+
+# Sliding window log: one zset member per *admitted* request, with a unique
+# member so requests in the same millisecond are all counted. Denied
+# requests do not write.
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    count = count + 1
+    allowed = 1
+end
+
+local reset = now + window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+return {allowed, limit - count, reset}
+"""
+
+# GCRA (generic cell rate algorithm): a token bucket stored as a single
+# "theoretical arrival time" per client, O(1) memory. Allows bursts of up to
+# `limit` and refills one request every window/limit.
+_GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local emission = period / limit
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+local remaining = math.floor((now - allow_at) / emission)
+return {1, remaining, math.ceil(new_tat)}
+"""
+
+_SCRIPTS = {
+    "sliding_window": _SLIDING_WINDOW_SCRIPT,
+    "gcra": _GCRA_SCRIPT,
+}
+
+
+async def check_rate_limit(
+    key: str,
+    limit: int,
+    window_seconds: int,
+    algorithm: str | None = None,
+) -> RateLimitResult:
+    algorithm = algorithm or settings.rate_limit_algorithm
     r = await init_redis()
-    now = int(time.time())
-    window_start = now - window_seconds
+    script = r.register_script(_SCRIPTS[algorithm])  # EVALSHA, loads on first miss
+
+    with observe_redis("rate_limit"):
+        allowed, remaining, reset_ms = await script(
+            keys=[f"rl:{algorithm}:{key}"],
+            args=[limit, window_seconds * 1000, uuid.uuid4().hex],
+        )
+
+    return RateLimitResult(
+        limit=limit,
+        remaining=max(0, int(remaining)),
+        reset=math.ceil(int(reset_ms) / 1000),
+        allowed=bool(allowed),
+    )
+
+
+# --------------------
+# Local-first limiting (settings.rate_limit_mode = "local" | "hybrid")
+# --------------------
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending", "seen_global")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.pending = 0  # admitted here, not yet pushed to Redis
+        self.seen_global: int | None = None  # last global counter we saw
+
+
+class LocalRateLimiter:
+    # Per-worker token buckets keyed by _client_key: admission is a dict
+    # lookup and some float math, no network hop. In hybrid mode a background
+    # task pushes each bucket's admitted count to a shared Redis counter in
+    # one pipeline per interval and drains the tokens other workers spent,
+    # so the limit holds across workers up to one sync interval of drift.
+    def __init__(self):
+        self._buckets: dict[str, _Bucket] = {}
+        self.redis_healthy = True
+
+    def take(self, key: str, limit: int, window_seconds: int) -> RateLimitResult:
+        now = time.time()
+        rate = limit / window_seconds
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(float(limit), now)
+        else:
+            bucket.tokens = min(limit, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.pending += 1
+            return RateLimitResult(
+                limit=limit,
+                remaining=int(bucket.tokens),
+                reset=math.ceil(now + (limit - bucket.tokens) / rate),
+                allowed=True,
+            )
+
+        return RateLimitResult(
+            limit=limit,
+            remaining=0,
+            reset=math.ceil(now + (1 - bucket.tokens) / rate),
+            allowed=False,
+        )
+
+    def prune(self, window_seconds: int, keep_pending: bool = False) -> None:
+        # Buckets idle for a whole window are full again; drop them (unless
+        # they still hold admissions Redis has not seen).
+        now = time.time()
+        for key, bucket in list(self._buckets.items()):
+            if keep_pending and bucket.pending:
+                continue
+            if now - bucket.updated > window_seconds:
+                del self._buckets[key]
 
-    # Sliding window using a sorted set
-    zkey = f"rl:{key}"
-    pipe = r.pipeline()
-    pipe.zremrangebyscore(zkey, 0, window_start)
-    pipe.zadd(zkey, {str(now): now})
-    pipe.zcard(zkey)
-    pipe.expire(zkey, window_seconds + 5)
-    _, _, count, _ = await pipe.execute()
+    async def sync(self, window_seconds: int) -> None:
+        self.prune(window_seconds, keep_pending=True)
+        if not self._buckets:
+            return
 
-    count = int(count)
-    allowed = count <= limit
-    remaining = max(0, limit - count)
-    reset = now + window_seconds
+        snapshot = [(key, bucket, bucket.pending) for key, bucket in self._buckets.items()]
+        r = await init_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            for key, _, pushed in snapshot:
+                pipe.incrby(f"rl:hybrid:{key}", pushed)
+                pipe.expire(f"rl:hybrid:{key}", window_seconds * 2)
+            results = await pipe.execute()
 
-    return RateLimitResult(limit=limit, remaining=remaining, reset=reset, allowed=allowed)
+        for (key, bucket, pushed), total in zip(snapshot, results[::2]):
+            bucket.pending -= pushed
+            if bucket.seen_global is not None:
+                spent_elsewhere = max(0, total - bucket.seen_global - pushed)
+                bucket.tokens = max(0.0, bucket.tokens - spent_elsewhere)
+            bucket.seen_global = total
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+local_limiter = LocalRateLimiter()
+_sync_task: asyncio.Task | None = None
+
+
+async def _sync_loop() -> None:
+    interval = settings.rate_limit_sync_interval_ms / 1000
+    while True:
+        await asyncio.sleep(interval)
+        if settings.rate_limit_mode != "hybrid":
+            # local mode, or fail-open fallback in redis mode: bound memory
+            local_limiter.prune(settings.rate_limit_window_seconds)
+            continue
+        try:
+            await local_limiter.sync(settings.rate_limit_window_seconds)
+            local_limiter.redis_healthy = True
+        except Exception as e:
+            if local_limiter.redis_healthy:
+                logger.warning("Rate limit sync failed", exc_info=e)
+            local_limiter.redis_healthy = False
+
+
+def start_rate_limit_sync() -> None:
+    global _sync_task
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_rate_limit_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
+
+
+async def _decide(key: str) -> RateLimitResult | None:
+    # None means "Redis is unreachable and policy is fail-closed".
+    limit = settings.rate_limit_requests
+    window_seconds = settings.rate_limit_window_seconds
+    mode = settings.rate_limit_mode
+
+    if mode == "local":
+        return local_limiter.take(key, limit, window_seconds)
+
+    if mode == "hybrid":
+        if not local_limiter.redis_healthy and not settings.rate_limit_fail_open:
+            return None
+        return local_limiter.take(key, limit, window_seconds)
+
+    try:
+        return await check_rate_limit(key=key, limit=limit, window_seconds=window_seconds)
+    except Exception as e:
+        logger.warning("Rate limiter unavailable", exc_info=e)
+        if not settings.rate_limit_fail_open:
+            return None
+        # Fail open: admit, but still bound the client per worker.
+        return local_limiter.take(key, limit, window_seconds)
+
+
+# Pure ASGI (no BaseHTTPMiddleware): no extra task or memory stream per
+# request, and streaming responses pass straight through.
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Allow public endpoints without rate limit if you want
-        path = request.url.path
-        if path.startswith("/v1/health") or path.startswith("/docs") or path.startswith("/openapi.json"):
-            return await call_next(request)
+        path = scope["path"]
+        if path.startswith(("/v1/health", "/docs", "/openapi.json", "/metrics")):
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope)
         key = _client_key(request)
-        result = await check_rate_limit(
-            key=key,
-            limit=settings.rate_limit_requests,
-            window_seconds=settings.rate_limit_window_seconds,
-        )
+        with span("rate_limit"):
+            result = await _decide(key)
+
+        if result is None:
+            RATE_LIMIT_DECISIONS.labels("unavailable").inc()
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error": {
+                        "code": "RATE_LIMIT_UNAVAILABLE",
+                        "message": "Rate limiter unavailable",
+                        "request_id": getattr(request.state, "request_id", None),
+                    }
+                },
+            )
+            await response(scope, receive, send)
+            return
 
         if not result.allowed:
+            RATE_LIMIT_DECISIONS.labels("limited").inc()
             retry_after = max(0, result.reset - int(time.time()))
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "error": {
@@ -75,11 +315,18 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "X-RateLimit-Reset": str(result.reset),
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        RATE_LIMIT_DECISIONS.labels("allowed").inc()
 
-        response = await call_next(request)
+        async def send_with_headers(message: Message):
+            # Add rate limit headers on successful responses too
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(result.limit)
+                headers["X-RateLimit-Remaining"] = str(result.remaining)
+                headers["X-RateLimit-Reset"] = str(result.reset)
+            await send(message)
 
-        # Add rate limit headers on successful responses too
-        response.headers["X-RateLimit-Limit"] = str(result.limit)
-        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
-        response.headers["X-RateLimit-Reset"] = str(result.reset)
-        return response
\ No newline at end of file
+        await self.app(scope, receive, send_with_headers)
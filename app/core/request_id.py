@@ -1,14 +1,26 @@
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        request.state.request_id = request_id
+# Pure ASGI (no BaseHTTPMiddleware): no extra task or memory stream per
+# request, and streaming responses pass straight through.
+class RequestIDMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
\ No newline at end of file
+        request_id = Headers(scope=scope).get("X-Request-ID", str(uuid.uuid4()))
+        # Same dict that backs request.state
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
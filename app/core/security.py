@@ -1,6 +1,8 @@
+import uuid
 import jwt
 from datetime import datetime, timedelta, UTC
 from passlib.context import CryptContext
+from app.core.hash_pool import password_pool
 
 SECRET_KEY = "CHANGE_ME_IN_PROD"
 ALGORITHM = "HS256"
@@ -17,10 +19,22 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+# Async entry points for request handlers: bcrypt runs on the bounded
+# password pool instead of the event loop.
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(UTC)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # jti: lets a single token be revoked (see app/core/auth_cache.py)
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -0,0 +1,202 @@
+import logging
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Per-request timing spans. TimingMiddleware puts a RequestTimer in a
+# context variable; hot paths wrap themselves in span("db"), span("cache"),
+# ... which is a no-op outside a request. Context variables follow the
+# request into tasks and run_in_threadpool, so spans nest correctly even
+# for concurrent fan-out.
+logger = logging.getLogger(__name__)
+
+_MAX_QUERIES = 200  # SQL statements kept per request for the slow sampler
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "parent")
+
+    def __init__(self, name: str, start: float, parent: int | None):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.parent = parent
+
+
+class QueryStats:
+    # Every statement a request ran: count, total time, and how often each
+    # distinct SQL string repeated (the same text N times is usually N+1).
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+class RequestTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: list[Span] = []
+        self.queries: list[tuple[str, float, int | None]] = []
+        self.sql = QueryStats()
+
+    def totals(self) -> dict[str, float]:
+        # Seconds per span name; a span nested in one of the same name
+        # (e.g. db inside db) is already counted by its ancestor.
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            parent = span.parent
+            while parent is not None and self.spans[parent].name != span.name:
+                parent = self.spans[parent].parent
+            if parent is None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def server_timing(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.totals().items()]
+        if self.sql.count:
+            entries.append(
+                f'sql;dur={self.sql.duration * 1000:.2f};desc="{self.sql.count} queries"'
+            )
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(entries)
+
+    def tree(self) -> list[dict]:
+        return [
+            {
+                "name": span.name,
+                "parent": span.parent,
+                "start_ms": round((span.start - self.start) * 1000, 2),
+                "duration_ms": round(span.duration * 1000, 2),
+            }
+            for span in self.spans
+        ]
+
+
+_timer: ContextVar[RequestTimer | None] = ContextVar("request_timer", default=None)
+_parent: ContextVar[int | None] = ContextVar("request_span", default=None)
+
+
+@contextmanager
+def span(name: str):
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+
+    current = Span(name, time.perf_counter(), _parent.get())
+    timer.spans.append(current)
+    token = _parent.set(len(timer.spans) - 1)
+    try:
+        yield
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _parent.reset(token)
+
+
+def record_query(statement: str, duration: float) -> None:
+    # Called from the engine hook; statements are only kept, not formatted.
+    timer = _timer.get()
+    if timer is None:
+        return
+    timer.sql.record(statement, duration)
+    if len(timer.queries) < _MAX_QUERIES:
+        timer.queries.append((statement, duration, _parent.get()))
+
+
+# Tests register here to receive each finished request's QueryStats and
+# assert query budgets per endpoint. A plain list rather than a context
+# variable: the test client runs the app on another thread.
+_captures: list[list[QueryStats]] = []
+
+
+@contextmanager
+def capture_queries():
+    captured: list[QueryStats] = []
+    _captures.append(captured)
+    try:
+        yield captured
+    finally:
+        _captures.remove(captured)
+
+
+def _check_queries(scope: Scope, timer: RequestTimer) -> None:
+    for captured in _captures:
+        captured.append(timer.sql)
+
+    threshold = settings.repeated_query_threshold
+    if not threshold:
+        return
+    for statement, count in timer.sql.repeated(threshold).items():
+        logger.warning({
+            "repeated_query": statement,
+            "count": count,
+            "request_id": scope.get("state", {}).get("request_id"),
+            "path": scope["path"],
+        })
+
+
+# Most recent slow requests by request_id (bounded), each also logged.
+slow_requests: OrderedDict[str, dict] = OrderedDict()
+
+
+def _sample(scope: Scope, timer: RequestTimer, duration: float) -> None:
+    request_id = scope.get("state", {}).get("request_id")
+    sample = {
+        "request_id": request_id,
+        "method": scope["method"],
+        "path": scope["path"],
+        "duration_ms": round(duration * 1000, 2),
+        "spans": timer.tree(),
+        "queries": [
+            {"sql": sql, "duration_ms": round(seconds * 1000, 2), "parent": parent}
+            for sql, seconds, parent in timer.queries
+        ],
+    }
+    slow_requests[request_id] = sample
+    while len(slow_requests) > settings.slow_request_samples:
+        slow_requests.popitem(last=False)
+    logger.warning({"slow_request": sample})
+
+
+# Pure ASGI, like the other middlewares. Sits outside RateLimitMiddleware
+# so the limiter's own time is part of the breakdown.
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _timer.set(timer)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start" and settings.server_timing_enabled:
+                MutableHeaders(scope=message).append("Server-Timing", timer.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timer.reset(token)
+            _check_queries(scope, timer)
+            duration = time.perf_counter() - timer.start
+            threshold = settings.slow_request_ms
+            if threshold and duration * 1000 >= threshold:
+                _sample(scope, timer, duration)
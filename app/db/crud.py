@@ -1,20 +1,348 @@
+import re
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import (
+    and_, case, column, delete, func, insert, literal_column, or_, select, table, update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from app.db.models import Item
-from app.schemas.items import ItemCreate, ItemUpdate
+from app.db.expressions import likely
+from app.db.models import CategoryStats, Item, ItemTombstone, _utcnow
+from app.schemas.items import ItemCreate, ItemFilters, ItemUpdate
 from app.db.models import User
-from app.core.security import hash_password, verify_password
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor, Position
+from app.core.security import verify_password
+from app.core.exceptions import BadRequestError
 
+# Sort fields accepted by list_items (offset and keyset); each has a
+# (field, id) index on items and a (category, field, id) one for the
+# category filter (sku is unique on its own, id is the primary key).
+# Anything else would mean an unindexed sort, so it is rejected.
+SORT_FIELDS = {"id", "name", "sku", "price", "quantity", "created_at", "updated_at"}
+# Unique on their own: ordered without the id tiebreaker.
+UNIQUE_SORT_FIELDS = {"id", "sku"}
 
+# Columns (and their order) in NDJSON/CSV exports.
+EXPORT_FIELDS = (
+    "id", "sku", "name", "category", "quantity", "price",
+    "is_active", "created_at", "updated_at",
+)
+
+# FTS5 index maintained by app/db/search.py (SQLite only).
+items_fts = table("items_fts", column("rowid"), column("rank"), column("items_fts"))
+
+# Columns overwritten when a bulk upsert hits an existing sku.
+UPSERT_FIELDS = ("name", "category", "quantity", "price")
+
+
+# --------------------
+# Statement builders (shared with app/db/crud_async.py)
+# --------------------
+def filtered_items_stmt(
+    category: str | None = None,
+    filters: ItemFilters | None = None,
+):
+    stmt = select(Item)
+
+    if category:
+        stmt = stmt.where(Item.category == category)
+
+    if filters is None:
+        return stmt
+
+    ranges = (
+        (Item.price, filters.min_price, filters.max_price),
+        (Item.quantity, filters.min_quantity, filters.max_quantity),
+        (Item.created_at, filters.created_after, filters.created_before),
+        (Item.updated_at, filters.updated_after, filters.updated_before),
+    )
+    for column, low, high in ranges:
+        if low is not None:
+            stmt = stmt.where(column >= low)
+        if high is not None:
+            stmt = stmt.where(column <= high)
+
+    # Most items are active, so is_active=true narrows little: marked as
+    # such, it is checked while walking the sort index instead of searched.
+    if filters.is_active:
+        stmt = stmt.where(likely(Item.is_active == filters.is_active))
+    elif filters.is_active is not None:
+        stmt = stmt.where(Item.is_active == filters.is_active)
+
+    return stmt
+
+
+def items_stmt(
+    skip: int = 0,
+    limit: int = 10,
+    category: str | None = None,
+    sort: str | None = None,
+    filters: ItemFilters | None = None,
+):
+    stmt = filtered_items_stmt(category, filters)
+
+    if sort:
+        descending = sort.startswith("-")
+        field = sort[1:] if descending else sort
+        if field not in SORT_FIELDS:
+            raise BadRequestError(f"Unsupported sort field: {field}")
+        column = getattr(Item, field)
+        order = [column.desc() if descending else column.asc()]
+        if field not in UNIQUE_SORT_FIELDS:
+            order.append(Item.id.desc() if descending else Item.id.asc())
+        stmt = stmt.order_by(*order)
+
+    return stmt.offset(skip).limit(limit)
+
+
+def items_page_stmt(
+    limit: int = 10,
+    category: str | None = None,
+    sort: str | None = None,
+    cursor: str | None = None,
+    filters: ItemFilters | None = None,
+):
+    # Keyset pagination: seek past the last (sort value, id) instead of
+    # OFFSET, so every page costs the same regardless of depth.
+    descending = bool(sort) and sort.startswith("-")
+    field = (sort[1:] if descending else sort) or None
+    if field is not None and field not in SORT_FIELDS:
+        raise BadRequestError(f"Unsupported sort field: {field}")
+
+    column = getattr(Item, field) if field else Item.id
+    stmt = filtered_items_stmt(category, filters)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        if field is None:
+            stmt = stmt.where(Item.id > last_id)
+        elif descending:
+            stmt = stmt.where(
+                or_(column < value, and_(column == value, Item.id < last_id))
+            )
+        else:
+            stmt = stmt.where(
+                or_(column > value, and_(column == value, Item.id > last_id))
+            )
+
+    order = [column.desc() if descending else column.asc()]
+    if field not in UNIQUE_SORT_FIELDS and field is not None:
+        order.append(Item.id.desc() if descending else Item.id.asc())
+    stmt = stmt.order_by(*order)
+
+    # Fetch one extra row to know whether another page exists.
+    return stmt.limit(limit + 1)
+
+
+def items_page_result(
+    items: list[Item],
+    limit: int,
+    sort: str | None,
+) -> tuple[list[Item], str | None]:
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    last = items[-1]
+    field = sort.lstrip("-") if sort else "id"
+    return items, encode_cursor(sort, getattr(last, field), last.id)
+
+
+def search_items_stmt(
+    dialect: str,
+    q: str,
+    limit: int = 20,
+    cursor: str | None = None,
+):
+    # Every word in q is a prefix ("red wid" -> "red"* "wid"*), matched
+    # against sku and name. Selects (Item, rank); pages seek on (rank, id).
+    words = re.findall(r"\w+", q)
+    if not words:
+        raise BadRequestError("Search query must contain letters or digits")
+    after = decode_cursor(cursor, f"search:{q}") if cursor else None
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{word}"*' for word in words)
+        ranked = (
+            select(items_fts.c.rowid.label("fts_rowid"), items_fts.c.rank)
+            .where(items_fts.c.items_fts.op("MATCH")(match))
+            .subquery()
+        )
+        rank = ranked.c.rank  # bm25: lower is better
+        stmt = select(Item, rank).join(
+            ranked, literal_column("items.rowid") == ranked.c.fts_rowid
+        )
+    else:
+        # No FTS index: prefix LIKE on both columns, ordered by name. \w
+        # matches "_", a LIKE wildcard, so patterns are escaped.
+        rank = Item.name
+        patterns = [re.sub(r"([\\%_])", r"\\\1", word) + "%" for word in words]
+        stmt = select(Item, rank).where(
+            and_(*(
+                or_(
+                    Item.sku.ilike(pattern, escape="\\"),
+                    Item.name.ilike(pattern, escape="\\"),
+                )
+                for pattern in patterns
+            ))
+        )
+
+    if after:
+        value, last_id = after
+        stmt = stmt.where(or_(rank > value, and_(rank == value, Item.id > last_id)))
+
+    return stmt.order_by(rank, Item.id).limit(limit + 1)
+
+
+def search_items_result(
+    rows,
+    q: str,
+    limit: int,
+) -> tuple[list[Item], str | None]:
+    items = [item for item, _ in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    last, rank = rows[limit - 1]
+    return items, encode_cursor(f"search:{q}", rank, last.id)
+
+
+def category_stats_stmt(dialect: str, low_stock_threshold: int):
+    if dialect == "sqlite":
+        # Rollup rows maintained by triggers (app/db/rollups.py).
+        return select(
+            CategoryStats.category,
+            CategoryStats.item_count,
+            CategoryStats.total_quantity,
+            CategoryStats.stock_value,
+            CategoryStats.low_stock_count,
+        ).order_by(CategoryStats.category)
+
+    quantity = func.coalesce(Item.quantity, 0)
+    category = func.coalesce(Item.category, "")
+    return (
+        select(
+            category.label("category"),
+            func.count().label("item_count"),
+            func.sum(quantity).label("total_quantity"),
+            func.sum(quantity * Item.price).label("stock_value"),
+            func.sum(case((quantity <= low_stock_threshold, 1), else_=0)).label("low_stock_count"),
+        )
+        .group_by(category)
+        .order_by(category)
+    )
+
+
+def item_stmt(item_id: str):
+    return select(Item).where(Item.id == item_id)
+
+
+def items_by_ids_stmt(item_ids: list[str]):
+    return select(Item).where(Item.id.in_(item_ids))
+
+
+def items_upsert_stmt(dialect: str):
+    # INSERT ... ON CONFLICT (sku) DO UPDATE, executed once per chunk with
+    # executemany parameters. RETURNING keeps parameter order.
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(Item)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Item.sku],
+        set_={
+            **{field: stmt.excluded[field] for field in UPSERT_FIELDS},
+            "updated_at": _utcnow(),
+        },
+    )
+    return stmt.returning(Item.id, Item.sku, sort_by_parameter_order=True)
+
+
+def export_items_stmt(
+    category: str | None = None,
+    updated_since: datetime | None = None,
+):
+    # Plain column tuples, not ORM entities: exports skip the identity map.
+    stmt = select(*(getattr(Item, field) for field in EXPORT_FIELDS))
+
+    if category:
+        stmt = stmt.where(Item.category == category)
+
+    if updated_since is not None:
+        if updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=UTC)
+        stmt = stmt.where(Item.updated_at >= updated_since.astimezone(UTC))
+
+    return stmt.order_by(Item.id)
+
+
+def changed_items_stmt(after: Position, until: datetime, limit: int):
+    # Keyset over (updated_at, id), served by ix_items_updated_at_id.
+    stmt = select(Item).where(Item.updated_at <= until)
+    if after:
+        value, last_id = after
+        stmt = stmt.where(
+            or_(Item.updated_at > value, and_(Item.updated_at == value, Item.id > last_id))
+        )
+    return stmt.order_by(Item.updated_at, Item.id).limit(limit + 1)
+
+
+def tombstones_stmt(after: Position, until: datetime, limit: int):
+    stmt = select(ItemTombstone).where(ItemTombstone.deleted_at <= until)
+    if after:
+        value, last_id = after
+        stmt = stmt.where(
+            or_(
+                ItemTombstone.deleted_at > value,
+                and_(ItemTombstone.deleted_at == value, ItemTombstone.id > last_id),
+            )
+        )
+    return stmt.order_by(ItemTombstone.deleted_at, ItemTombstone.id).limit(limit + 1)
+
+
+def prune_tombstones_stmt():
+    # Run alongside every delete, so the table holds about one retention
+    # window of tombstones (range delete on ix_item_tombstones_deleted_at_id).
+    cutoff = _utcnow() - timedelta(days=settings.changes_retention_days)
+    return delete(ItemTombstone).where(ItemTombstone.deleted_at < cutoff)
+
+
+def existing_skus_stmt(skus: list[str]):
+    return select(Item.sku).where(Item.sku.in_(skus))
+
+
+def existing_ids_stmt(item_ids: list[str]):
+    return select(Item.id).where(Item.id.in_(item_ids))
+
+
+def user_by_email_stmt(email: str):
+    return select(User).where(User.email == email)
+
+
+# --------------------
+# Items
+# --------------------
 def create_item(db: Session, item: ItemCreate) -> Item:
     db_item = Item(**item.model_dump())
     db.add(db_item)
     db.commit()
-    db.refresh(db_item)   
     return db_item
 
 
 def get_item(db: Session, item_id: str):
-    return db.query(Item).filter(Item.id == item_id).first()
+    return db.scalars(item_stmt(item_id)).first()
+
+
+def get_items_by_ids(db: Session, item_ids: list[str]) -> list[Item]:
+    # One IN query; order is not guaranteed, callers map by id.
+    return list(db.scalars(items_by_ids_stmt(item_ids)).all())
+
+
+def search_items(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> tuple[list[Item], str | None]:
+    stmt = search_items_stmt(db.get_bind().dialect.name, q, limit, cursor)
+    return search_items_result(db.execute(stmt).all(), q, limit)
 
 
 def get_items(
@@ -23,47 +351,126 @@ def get_items(
     limit: int = 10,
     category: str | None = None,
     sort: str | None = None,
+    filters: ItemFilters | None = None,
 ):
-    query = db.query(Item)
+    return db.scalars(items_stmt(skip, limit, category, sort, filters)).all()
 
-    if category:
-        query = query.filter(Item.category == category)
-
-    if sort:
-        if sort.startswith("-"):
-            query = query.order_by(getattr(Item, sort[1:]).desc())
-        else:
-            query = query.order_by(getattr(Item, sort).asc())
 
-    return query.offset(skip).limit(limit).all()
+def get_items_page(
+    db: Session,
+    limit: int = 10,
+    category: str | None = None,
+    sort: str | None = None,
+    cursor: str | None = None,
+    filters: ItemFilters | None = None,
+) -> tuple[list[Item], str | None]:
+    items = db.scalars(items_page_stmt(limit, category, sort, cursor, filters)).all()
+    return items_page_result(list(items), limit, sort)
 
 
 def update_item(db: Session, item: Item, updates: ItemUpdate):
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     db.commit()
-    db.refresh(item)
     return item
 
 
 def delete_item(db: Session, item: Item):
+    db.execute(prune_tombstones_stmt())
+    db.add(ItemTombstone(id=item.id))
     db.delete(item)
     db.commit()
 
-def create_user(db, email: str, password: str, role: str = "user"):
+
+# Each list holds up to limit + 1 rows; the extra one means "has more".
+def get_changes(
+    db: Session,
+    items_after: Position,
+    deletes_after: Position,
+    until: datetime,
+    limit: int = 100,
+) -> tuple[list[Item], list[ItemTombstone]]:
+    items = db.scalars(changed_items_stmt(items_after, until, limit)).all()
+    tombstones = db.scalars(tombstones_stmt(deletes_after, until, limit)).all()
+    return list(items), list(tombstones)
+
+
+# --------------------
+# Bulk items: one statement and one commit per chunk, no per-row refresh
+# --------------------
+def upsert_items(db: Session, rows: list[dict]) -> dict[str, tuple[str, bool]]:
+    # Returns {sku: (id, created)}. A sku repeated within the chunk is
+    # written once, with its last row.
+    rows = list({row["sku"]: row for row in rows}.values())
+    try:
+        existing = set(db.scalars(existing_skus_stmt([row["sku"] for row in rows])))
+        stmt = items_upsert_stmt(db.get_bind().dialect.name)
+        written = db.execute(stmt, rows).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {sku: (item_id, sku not in existing) for item_id, sku in written}
+
+
+def update_items(db: Session, rows: list[dict]) -> set[str]:
+    # Each row is {"id": ..., <changed fields>}; returns the ids updated.
+    try:
+        existing = set(db.scalars(existing_ids_stmt([row["id"] for row in rows])))
+        rows = [row for row in rows if row["id"] in existing]
+        if rows:
+            db.execute(update(Item), rows)  # executemany by primary key
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return existing
+
+
+def delete_items(db: Session, item_ids: list[str]) -> set[str]:
+    try:
+        existing = set(db.scalars(existing_ids_stmt(item_ids)))
+        if existing:
+            db.execute(prune_tombstones_stmt())
+            db.execute(delete(Item).where(Item.id.in_(existing)))
+            db.execute(insert(ItemTombstone), [{"id": item_id} for item_id in existing])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return existing
+
+
+def get_category_stats(db: Session, low_stock_threshold: int) -> list[dict]:
+    stmt = category_stats_stmt(db.get_bind().dialect.name, low_stock_threshold)
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+# --------------------
+# Users
+# --------------------
+def get_user_by_email(db: Session, email: str):
+    return db.scalars(user_by_email_stmt(email)).first()
+
+
+# Hashing happens in the caller (security.hash_password_async) so bcrypt
+# never runs on a DB thread or the event loop. Keyword-only: a plaintext
+# password passed where it used to go must fail, not be stored.
+def create_user(db, email: str, *, hashed_password: str, role: str = "user"):
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=hashed_password,
         role=role,
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
+# Sync callers (scripts) verify inline; the async variant verifies on the
+# password pool, as the login route does.
 def authenticate_user(db, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+    user = get_user_by_email(db, email)
     if not user or not verify_password(password, user.hashed_password):
         return None
-    return user
\ No newline at end of file
+    return user
@@ -0,0 +1,211 @@
+from typing import Any, Callable
+
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.db import crud
+from app.core.pagination import Position
+from app.core.security import verify_password_async
+from app.core.timing import span
+from app.db.models import Item, ItemTombstone, User
+from app.schemas.items import ItemCreate, ItemFilters, ItemUpdate
+
+# Async variants of app/db/crud.py, keyed by the sync function they mirror.
+# Statements are built by the same helpers, so both paths issue identical SQL.
+_VARIANTS: dict[Callable, Callable] = {}
+
+
+def _mirrors(sync_fn: Callable):
+    def register(fn):
+        _VARIANTS[sync_fn] = fn
+        return fn
+    return register
+
+
+async def dispatch(db, fn: Callable, *args: Any, **kwargs: Any):
+    # Run a crud function against whichever session the route received:
+    # the native async variant for an AsyncSession, otherwise the sync
+    # function in the threadpool so the event loop never blocks on SQL.
+    with span("db"):
+        if isinstance(db, AsyncSession):
+            return await _VARIANTS[fn](db, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+# --------------------
+# Items
+# --------------------
+@_mirrors(crud.create_item)
+async def create_item(db: AsyncSession, item: ItemCreate) -> Item:
+    db_item = Item(**item.model_dump())
+    db.add(db_item)
+    await db.commit()
+    return db_item
+
+
+@_mirrors(crud.get_item)
+async def get_item(db: AsyncSession, item_id: str):
+    return (await db.scalars(crud.item_stmt(item_id))).first()
+
+
+@_mirrors(crud.get_items_by_ids)
+async def get_items_by_ids(db: AsyncSession, item_ids: list[str]) -> list[Item]:
+    return list((await db.scalars(crud.items_by_ids_stmt(item_ids))).all())
+
+
+@_mirrors(crud.search_items)
+async def search_items(
+    db: AsyncSession,
+    q: str,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> tuple[list[Item], str | None]:
+    stmt = crud.search_items_stmt(db.get_bind().dialect.name, q, limit, cursor)
+    return crud.search_items_result((await db.execute(stmt)).all(), q, limit)
+
+
+@_mirrors(crud.get_items)
+async def get_items(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    category: str | None = None,
+    sort: str | None = None,
+    filters: ItemFilters | None = None,
+):
+    stmt = crud.items_stmt(skip, limit, category, sort, filters)
+    return (await db.scalars(stmt)).all()
+
+
+@_mirrors(crud.get_items_page)
+async def get_items_page(
+    db: AsyncSession,
+    limit: int = 10,
+    category: str | None = None,
+    sort: str | None = None,
+    cursor: str | None = None,
+    filters: ItemFilters | None = None,
+) -> tuple[list[Item], str | None]:
+    stmt = crud.items_page_stmt(limit, category, sort, cursor, filters)
+    items = (await db.scalars(stmt)).all()
+    return crud.items_page_result(list(items), limit, sort)
+
+
+@_mirrors(crud.update_item)
+async def update_item(db: AsyncSession, item: Item, updates: ItemUpdate):
+    for field, value in updates.model_dump(exclude_unset=True).items():
+        setattr(item, field, value)
+    await db.commit()
+    return item
+
+
+@_mirrors(crud.delete_item)
+async def delete_item(db: AsyncSession, item: Item):
+    await db.execute(crud.prune_tombstones_stmt())
+    db.add(ItemTombstone(id=item.id))
+    await db.delete(item)
+    await db.commit()
+
+
+@_mirrors(crud.get_changes)
+async def get_changes(
+    db: AsyncSession,
+    items_after: Position,
+    deletes_after: Position,
+    until: datetime,
+    limit: int = 100,
+) -> tuple[list[Item], list[ItemTombstone]]:
+    items = (await db.scalars(crud.changed_items_stmt(items_after, until, limit))).all()
+    tombstones = (await db.scalars(crud.tombstones_stmt(deletes_after, until, limit))).all()
+    return list(items), list(tombstones)
+
+
+# --------------------
+# Bulk items
+# --------------------
+@_mirrors(crud.upsert_items)
+async def upsert_items(db: AsyncSession, rows: list[dict]) -> dict[str, tuple[str, bool]]:
+    rows = list({row["sku"]: row for row in rows}.values())
+    try:
+        skus = [row["sku"] for row in rows]
+        existing = set(await db.scalars(crud.existing_skus_stmt(skus)))
+        stmt = crud.items_upsert_stmt(db.get_bind().dialect.name)
+        written = (await db.execute(stmt, rows)).all()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return {sku: (item_id, sku not in existing) for item_id, sku in written}
+
+
+@_mirrors(crud.update_items)
+async def update_items(db: AsyncSession, rows: list[dict]) -> set[str]:
+    try:
+        ids = [row["id"] for row in rows]
+        existing = set(await db.scalars(crud.existing_ids_stmt(ids)))
+        rows = [row for row in rows if row["id"] in existing]
+        if rows:
+            await db.execute(update(Item), rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return existing
+
+
+@_mirrors(crud.delete_items)
+async def delete_items(db: AsyncSession, item_ids: list[str]) -> set[str]:
+    try:
+        existing = set(await db.scalars(crud.existing_ids_stmt(item_ids)))
+        if existing:
+            await db.execute(crud.prune_tombstones_stmt())
+            await db.execute(delete(Item).where(Item.id.in_(existing)))
+            await db.execute(insert(ItemTombstone), [{"id": item_id} for item_id in existing])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return existing
+
+
+@_mirrors(crud.get_category_stats)
+async def get_category_stats(db: AsyncSession, low_stock_threshold: int) -> list[dict]:
+    stmt = crud.category_stats_stmt(db.get_bind().dialect.name, low_stock_threshold)
+    return [dict(row._mapping) for row in await db.execute(stmt)]
+
+
+# --------------------
+# Users
+# --------------------
+@_mirrors(crud.get_user_by_email)
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.scalars(crud.user_by_email_stmt(email))).first()
+
+
+@_mirrors(crud.create_user)
+async def create_user(
+    db: AsyncSession,
+    email: str,
+    *,
+    hashed_password: str,
+    role: str = "user",
+):
+    user = User(
+        email=email,
+        hashed_password=hashed_password,
+        role=role,
+    )
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@_mirrors(crud.authenticate_user)
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email(db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
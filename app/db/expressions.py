@@ -0,0 +1,22 @@
+from sqlalchemy import Boolean
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+# A condition most rows satisfy. SQLite's planner has no statistics unless
+# ANALYZE ran, and would otherwise search an index on it and sort the
+# (large) result; likelihood() makes it prefer the sort index. Other
+# backends plan from their own statistics and get the bare condition.
+class likely(FunctionElement):
+    type = Boolean()
+    inherit_cache = True
+
+
+@compiles(likely)
+def _compile_likely(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(likely, "sqlite")
+def _compile_likely_sqlite(element, compiler, **kw):
+    return f"likelihood({compiler.process(element.clauses, **kw)}, 0.9)"
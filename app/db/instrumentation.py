@@ -0,0 +1,80 @@
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import DB_QUERY_DURATION
+from app.core.timing import record_query
+
+logger = logging.getLogger(__name__)
+
+
+_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _explain(conn, statement, parameters) -> list[tuple]:
+    # Own cursor, so the slow statement's pending rows stay untouched.
+    cursor = conn.connection.cursor()
+    try:
+        if conn.dialect.name == "sqlite":
+            # A failed statement leaves SQLite's transaction intact (and it
+            # cannot open a savepoint while RETURNING rows are pending).
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            return [tuple(row) for row in cursor.fetchall()]
+
+        # Elsewhere (PostgreSQL) a failed statement aborts the transaction,
+        # which here is the request's: contain it in a savepoint.
+        cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            return [tuple(row) for row in cursor.fetchall()]
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+            raise
+        finally:
+            cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(conn, statement, parameters, elapsed: float) -> None:
+    try:
+        plan = _explain(conn, statement, parameters)
+    except Exception as e:
+        plan = repr(e)
+    logger.warning({
+        "slow_query": statement,
+        "duration_ms": round(elapsed * 1000, 2),
+        "plan": plan,
+    })
+
+
+# Times every statement on the engine (for an AsyncEngine, pass its
+# .sync_engine). Labelled by statement verb only, to bound cardinality.
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        verb = statement.lstrip()[:6].upper()
+        DB_QUERY_DURATION.labels(verb if verb in _VERBS else "OTHER").observe(elapsed)
+        record_query(statement, elapsed)
+
+        threshold = settings.slow_query_ms
+        if threshold and elapsed * 1000 >= threshold and verb in _VERBS and not executemany:
+            _log_slow_query(conn, statement, parameters, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # after_cursor_execute does not fire for failed statements, but
+        # they still count against the request.
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            elapsed = time.perf_counter() - starts.pop()
+            if context.statement is not None:
+                record_query(context.statement, elapsed)
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# One-off data fixes for existing SQLite databases. PRAGMA user_version
+# records how many have been applied, so each runs once per database file
+# (create_all only creates missing tables and never touches rows).
+_MIGRATIONS = [
+    # 1: rows written by the old server_default (CURRENT_TIMESTAMP) have no
+    # fractional seconds. SQLAlchemy binds "...:00.000000", which as a string
+    # neither equals nor precedes "...:00", so keyset seeks on created_at /
+    # updated_at skipped them. Pad them to the format SQLAlchemy writes.
+    [
+        "UPDATE items SET created_at = created_at || '.000000' WHERE length(created_at) = 19",
+        "UPDATE items SET updated_at = updated_at || '.000000' WHERE length(updated_at) = 19",
+        "UPDATE item_tombstones SET deleted_at = deleted_at || '.000000' WHERE length(deleted_at) = 19",
+    ],
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        applied = conn.execute(text("PRAGMA user_version")).scalar()
+        for version, statements in enumerate(_MIGRATIONS[applied:], start=applied + 1):
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(text(f"PRAGMA user_version = {version}"))
@@ -1,9 +1,16 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime
-from sqlalchemy.sql import func
+from datetime import datetime, UTC
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Index
 from app.db.session import Base
 
 
+def _utcnow() -> datetime:
+    # Python-side timestamps keep microseconds; SQLite's CURRENT_TIMESTAMP
+    # only has seconds and does not compare equal to bound datetimes, which
+    # breaks keyset seeks on created_at/updated_at.
+    return datetime.now(UTC)
+
+
 class Item(Base):
     __tablename__ = "items"
 
@@ -15,13 +22,57 @@ class Item(Base):
     price = Column(Float, nullable=False)
     is_active = Column(Boolean, default=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(
-        DateTime(timezone=True),
-        server_default=func.now(),
-        onupdate=func.now(),
+    # No server_default: CURRENT_TIMESTAMP rows would lack microseconds
+    # (see app/db/migrations.py for the ones written before).
+    created_at = Column(DateTime(timezone=True), default=_utcnow)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+
+    # Composite (sort column, id) indexes back keyset pagination in
+    # crud.get_items_page: every allowed sort field seeks on (value, id).
+    __table_args__ = (
+        Index("ix_items_name_id", "name", "id"),
+        Index("ix_items_price_id", "price", "id"),
+        Index("ix_items_quantity_id", "quantity", "id"),
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        # category=X with any sort (the most common listing) seeks the
+        # category and reads rows already in sort order.
+        Index("ix_items_category_id", "category", "id"),
+        Index("ix_items_category_name_id", "category", "name", "id"),
+        Index("ix_items_category_sku", "category", "sku"),  # sku is unique
+        Index("ix_items_category_price_id", "category", "price", "id"),
+        Index("ix_items_category_quantity_id", "category", "quantity", "id"),
+        Index("ix_items_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_items_category_updated_at_id", "category", "updated_at", "id"),
+        # is_active filter, and "active and low stock" range scans
+        Index("ix_items_is_active_quantity", "is_active", "quantity"),
     )
 
+# Left behind by deletes so the change feed (crud.get_changes) can report
+# them; keyed by the deleted item's id.
+class ItemTombstone(Base):
+    __tablename__ = "item_tombstones"
+
+    id = Column(String, primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_item_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
+
+
+# Per-category rollups behind GET /items/stats, maintained by triggers on
+# items (app/db/rollups.py). Items without a category roll up under "".
+class CategoryStats(Base):
+    __tablename__ = "category_stats"
+
+    category = Column(String, primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    stock_value = Column(Float, nullable=False, default=0.0)
+    low_stock_count = Column(Integer, nullable=False, default=0)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -0,0 +1,86 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# category_stats is kept current by triggers on items (SQLite), so every
+# write path -- single routes, bulk upserts, executemany updates, imports --
+# adjusts its category's row in the same transaction, and GET /items/stats
+# reads O(categories) rows. Other backends aggregate on read instead
+# (crud.category_stats_stmt).
+#
+# Each trigger applies "remove old row" and/or "add new row" deltas. The
+# low-stock threshold is baked into the triggers, so startup compares them
+# with sqlite_master and only recreates them -- and rebuilds the table from
+# items, a full GROUP BY -- when they changed or the table is empty.
+
+_ADD = """
+    INSERT INTO category_stats
+        (category, item_count, total_quantity, stock_value, low_stock_count)
+    VALUES (
+        COALESCE(new.category, ''), 1, COALESCE(new.quantity, 0),
+        COALESCE(new.quantity, 0) * new.price,
+        COALESCE(new.quantity, 0) <= {threshold}
+    )
+    ON CONFLICT(category) DO UPDATE SET
+        item_count = item_count + 1,
+        total_quantity = total_quantity + excluded.total_quantity,
+        stock_value = stock_value + excluded.stock_value,
+        low_stock_count = low_stock_count + excluded.low_stock_count;
+"""
+
+_REMOVE = """
+    UPDATE category_stats SET
+        item_count = item_count - 1,
+        total_quantity = total_quantity - COALESCE(old.quantity, 0),
+        stock_value = stock_value - COALESCE(old.quantity, 0) * old.price,
+        low_stock_count = low_stock_count - (COALESCE(old.quantity, 0) <= {threshold})
+    WHERE category = COALESCE(old.category, '');
+    DELETE FROM category_stats
+    WHERE category = COALESCE(old.category, '') AND item_count <= 0;
+"""
+
+_TRIGGERS = {
+    "category_stats_ai": ("AFTER INSERT ON items", _ADD),
+    "category_stats_ad": ("AFTER DELETE ON items", _REMOVE),
+    "category_stats_au": (
+        "AFTER UPDATE OF category, quantity, price ON items",
+        _REMOVE + _ADD,
+    ),
+}
+
+_REBUILD = """
+    INSERT INTO category_stats
+        (category, item_count, total_quantity, stock_value, low_stock_count)
+    SELECT
+        COALESCE(category, ''), COUNT(*), SUM(COALESCE(quantity, 0)),
+        SUM(COALESCE(quantity, 0) * price),
+        SUM(COALESCE(quantity, 0) <= {threshold})
+    FROM items
+    GROUP BY COALESCE(category, '')
+"""
+
+
+def init_category_stats(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    threshold = int(settings.low_stock_threshold)
+    wanted = {
+        name: f"CREATE TRIGGER {name} {event} BEGIN {body.format(threshold=threshold)} END"
+        for name, (event, body) in _TRIGGERS.items()
+    }
+    with engine.begin() as conn:
+        current = dict(conn.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'category_stats_%'")
+        ).all())
+        stale = [name for name, sql in wanted.items() if current.get(name) != sql]
+        for name in stale:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(wanted[name]))
+
+        empty = conn.execute(text("SELECT 1 FROM category_stats LIMIT 1")).first() is None
+        if stale or empty:
+            # Also absorbs float drift from many incremental stock_value updates.
+            conn.execute(text("DELETE FROM category_stats"))
+            conn.execute(text(_REBUILD.format(threshold=threshold)))
@@ -0,0 +1,76 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# SQLite full-text index over items.sku / items.name (FTS5, external content:
+# the index stores only tokens and reads rows back from `items`). Triggers
+# keep it in sync with every write path, including bulk upserts and
+# executemany updates. prefix='2 3' adds prefix indexes so short "abc*"
+# queries do not scan the whole term list.
+#
+# The index is keyed by items.rowid, which items (a String primary key)
+# does not pin down: VACUUM or a dump/restore may renumber it. A rebuild
+# re-reads every row, so startup only does one when the index is new or
+# its row set no longer matches items; session.vacuum_database() always
+# rebuilds.
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        sku, name,
+        content='items', content_rowid='rowid',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, sku, name) VALUES (new.rowid, new.sku, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, sku, name)
+        VALUES ('delete', old.rowid, old.sku, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF sku, name ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, sku, name)
+        VALUES ('delete', old.rowid, old.sku, old.name);
+        INSERT INTO items_fts(rowid, sku, name) VALUES (new.rowid, new.sku, new.name);
+    END
+    """,
+]
+
+
+def _out_of_sync(conn) -> bool:
+    # items_fts_docsize holds one row per indexed rowid, so comparing the
+    # rowid range and count with items is a cheap (index-only) drift check.
+    span = "SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {}"
+    indexed = conn.execute(text(span.format("items_fts_docsize"))).one()
+    current = conn.execute(text(span.format("items"))).one()
+    return tuple(indexed) != tuple(current)
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        # Re-read every row of items so tokens line up with current rowids.
+        conn.execute(text("INSERT INTO items_fts(items_fts) VALUES ('rebuild')"))
+
+
+def init_search_index(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        return  # other backends use the LIKE fallback in crud.search_items_stmt
+
+    created = not inspect(engine).has_table("items_fts")
+    with engine.begin() as conn:
+        for ddl in _FTS_DDL:
+            conn.execute(text(ddl))
+        if created:
+            # Rank sku hits above name hits (stored with the index).
+            conn.execute(
+                text("INSERT INTO items_fts(items_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')")
+            )
+        stale = created or _out_of_sync(conn)
+    if stale:
+        rebuild_search_index(engine)
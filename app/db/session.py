@@ -1,18 +1,96 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+
+
+def engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        if url.startswith("sqlite+aiosqlite"):
+            return {}
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+# Per-connection SQLite tuning (for an AsyncEngine, pass its .sync_engine).
+# journal_mode is stored in the database file, so only writers set it.
+def configure_sqlite(engine: Engine, read_only: bool = False) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = [
+        f"busy_timeout = {int(settings.sqlite_busy_timeout_ms)}",
+        f"synchronous = {settings.sqlite_synchronous}",
+        f"cache_size = -{int(settings.sqlite_cache_size_kb)}",
+        f"mmap_size = {int(settings.sqlite_mmap_size)}",
+    ]
+    if settings.sqlite_wal and not read_only:
+        pragmas.insert(1, "journal_mode = WAL")
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+
+def _sync_engine(url: str, read_only: bool = False) -> Engine:
+    engine = create_engine(url, **engine_options(url))
+    configure_sqlite(engine, read_only)
+    instrument_engine(engine)
+    return engine
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # SQLite only
-)
 
+def _async_engine(url: str, read_only: bool = False):
+    engine = create_async_engine(url, **engine_options(url))
+    configure_sqlite(engine.sync_engine, read_only)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+engine = _sync_engine(settings.database_url)
+
+# expire_on_commit=False: crud returns objects straight after commit (all
+# column values are set client-side), so reloading them is a wasted SELECT.
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
 )
 
+# Read replica: without one, reads share the primary's sessions.
+read_engine = (
+    _sync_engine(settings.read_database_url, read_only=True)
+    if settings.read_database_url
+    else engine
+)
+ReadSessionLocal = (
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=read_engine,
+    )
+    if settings.read_database_url
+    else SessionLocal
+)
+
 Base = declarative_base()
 
 
@@ -21,4 +99,103 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def async_url(url: str) -> str:
+    # Map a sync URL onto its async driver.
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+# Only built when enabled so the async driver stays an optional install.
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if settings.db_async:
+    async_engine = _async_engine(
+        settings.async_database_url or async_url(settings.database_url)
+    )
+    # expire_on_commit=False: routes serialize ORM objects after commit and
+    # an expired attribute cannot lazy-load outside the greenlet.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.read_database_url or settings.async_read_database_url:
+        AsyncReadSessionLocal = async_sessionmaker(
+            _async_engine(
+                settings.async_read_database_url or async_url(settings.read_database_url),
+                read_only=True,
+            ),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# A session owned by the caller instead of a request, for work that may
+# outlive it (e.g. a cache fill shared by several requests). read=True
+# uses the read replica when one is configured (see read_database_url).
+@asynccontextmanager
+async def session_scope(read: bool = False):
+    if settings.db_async:
+        async with (AsyncReadSessionLocal if read else AsyncSessionLocal)() as db:
+            yield db
+        return
+
+    db = (ReadSessionLocal if read else SessionLocal)()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+# Route dependency: AsyncSession when settings.db_async, else a sync Session.
+# Pair with crud_async.dispatch() to call crud functions on either.
+get_session = get_async_db if settings.db_async else get_db
+
+
+def init_db():
+    from app.db import models  # noqa: F401  (registers tables on Base)
+
+    Base.metadata.create_all(bind=engine)
+
+    # create_all skips tables that already exist, so indexes added to the
+    # models later would never reach an existing database.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    from app.db.migrations import run_migrations
+    from app.db.search import init_search_index
+    from app.db.rollups import init_category_stats
+
+    run_migrations(engine)
+    init_search_index(engine)
+    init_category_stats(engine)
+
+
+def vacuum_database():
+    # VACUUM may renumber items.rowid, which the search index is keyed by.
+    if engine.dialect.name != "sqlite":
+        return
+
+    from app.db.search import init_search_index, rebuild_search_index
+
+    init_search_index(engine)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+    rebuild_search_index(engine)
@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.redis_client import close_redis
+from app.db.session import SessionLocal, init_db
+from app.services.importer import import_items
+
+logger = logging.getLogger(__name__)
+
+
+# Usage: python -m app.import_items items.csv [--format csv|ndjson]
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import items from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    args = parser.parse_args(argv)
+
+    setup_logging(settings.log_level)
+    init_db()
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    async def run():
+        try:
+            with open(args.path, encoding="utf-8", newline="") as f, SessionLocal() as db:
+                return await import_items(db, f, fmt)
+        finally:
+            await close_redis()
+
+    report = asyncio.run(run())
+    print(json.dumps(report.as_dict()))
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,25 @@
-import time
 import logging
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, AccessLogMiddleware
 from app.core.request_id import RequestIDMiddleware
 from app.api.v1.routes import health
-from app.db.session import engine
-from app.db import models
+from app.db.session import init_db
 from app.api.v1.routes import items, auth
 from app.core.redis_client import init_redis, close_redis
 from contextlib import asynccontextmanager
-from app.core.rate_limit import RateLimitMiddleware
+from app.core.rate_limit import (
+    RateLimitMiddleware,
+    start_rate_limit_sync,
+    stop_rate_limit_sync,
+)
+from app.core.hash_pool import password_pool
+from app.core.cache import start_cache_listener, stop_cache_listener
+from app.core.events import event_hub
+from app.core.auth_cache import start_revocation_sync, stop_revocation_sync
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_endpoint
+from app.core.timing import TimingMiddleware
+from app.services.external import init_http_client, close_http_client
 
 # For exception handling
 from app.core.exceptions import AppException
@@ -19,15 +28,26 @@ from app.core.exception_handlers import (
     unhandled_exception_handler,
 )
 
-models.Base.metadata.create_all(bind=engine)
+init_db()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_redis()
+    await init_http_client()
+    start_cache_listener()
+    start_rate_limit_sync()
+    start_revocation_sync()
     yield
     # Shutdown
+    await stop_rate_limit_sync()
+    await stop_revocation_sync()
+    await stop_cache_listener()
+    await event_hub.stop()
     await close_redis()
+    await close_http_client()
+    password_pool.shutdown()
+    mark_process_dead()
 
 setup_logging(settings.log_level)
 logger = logging.getLogger(__name__)
@@ -48,24 +68,15 @@ app.add_middleware(RateLimitMiddleware)
 # API versioning
 app.include_router(health.router, prefix="/v1")
 
-#Middleware logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
-
-    logger.info(
-        {
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "duration_ms": round(duration * 1000, 2),
-            "request_id": getattr(request.state, "request_id", None),
-        }
-    )
-
-    return response
+# Request timing (outside the rate limiter so its Redis time is included)
+app.add_middleware(TimingMiddleware)
+
+#Middleware logging (outermost, as the former @app.middleware("http") was)
+app.add_middleware(AccessLogMiddleware, logger=logger)
+
+# Metrics (outermost: latency includes every middleware)
+app.add_middleware(MetricsMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 # Including routes for items
 app.include_router(items.router, prefix="/v1")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, UTC
 
 
 class ItemBase(BaseModel):
@@ -29,4 +29,72 @@ class ItemResponse(ItemBase):
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    # Always rendered as aware UTC. Stored values are UTC, but SQLite hands
+    # them back naive.
+    @field_validator("created_at", "updated_at")
+    @classmethod
+    def as_utc(cls, value):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+
+# Query-string filters for list_items; each is backed by an index on items.
+class ItemFilters(BaseModel):
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_quantity: Optional[int] = None
+    max_quantity: Optional[int] = None  # e.g. low stock: max_quantity=5
+    is_active: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+
+    # Timestamps are stored in UTC; naive input is taken as UTC.
+    @field_validator("created_after", "created_before", "updated_after", "updated_before")
+    @classmethod
+    def to_utc(cls, value):
+        if value is None:
+            return value
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+
+class ItemBulkUpdate(BaseModel):
+    id: str
+    name: Optional[str] = None
+    category: Optional[str] = None
+    quantity: Optional[int] = Field(None, ge=0)
+    price: Optional[float] = Field(None, gt=0)
+    is_active: Optional[bool] = None
+
+    # Omitted fields are left alone; only category may be set to null.
+    @field_validator("name", "quantity", "price", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+    @model_validator(mode="after")
+    def has_changes(self):
+        if not self.model_fields_set - {"id"}:
+            raise ValueError("no fields to update")
+        return self
+
+
+class ItemBulkDelete(BaseModel):
+    ids: list[str] = Field(..., min_length=1)
+
+
+class ItemEnrichRequest(BaseModel):
+    item_ids: list[str] = Field(..., min_length=1)
+
+
+class ItemPage(BaseModel):
+    items: list[ItemResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,93 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+
+import orjson
+
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal, AsyncSessionLocal
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# Rows come straight off a server-side cursor (yield_per) as plain tuples:
+# no ORM identity map, no pydantic models, and only one batch of rows and
+# one encoded chunk in memory at a time.
+def _encode_batch(fmt: str, rows) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(
+            orjson.dumps(dict(zip(crud.EXPORT_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def _header(fmt: str) -> bytes:
+    if fmt == "csv":
+        return (",".join(crud.EXPORT_FIELDS) + "\r\n").encode()
+    return b""
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(settings.export_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def _agzip(chunks):
+    compressor = zlib.compressobj(settings.export_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Each stream opens its own session: the request's dependency session is
+# not guaranteed to outlive the handler while the body is still streaming.
+def _iter_sync(fmt: str, category: str | None, updated_since: datetime | None):
+    yield _header(fmt)
+    stmt = crud.export_items_stmt(category, updated_since)
+    with SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=settings.export_batch_size))
+        for rows in result.partitions():
+            yield _encode_batch(fmt, rows)
+
+
+async def _iter_async(fmt: str, category: str | None, updated_since: datetime | None):
+    yield _header(fmt)
+    stmt = crud.export_items_stmt(category, updated_since)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.export_batch_size))
+        async for rows in result.partitions():
+            yield _encode_batch(fmt, rows)
+
+
+def export_items(
+    fmt: str,
+    category: str | None = None,
+    updated_since: datetime | None = None,
+    compress: bool = False,
+):
+    # Sync generators are iterated by StreamingResponse in the threadpool.
+    if settings.db_async:
+        chunks = _iter_async(fmt, category, updated_since)
+        return _agzip(chunks) if compress else chunks
+
+    chunks = _iter_sync(fmt, category, updated_since)
+    return _gzip(chunks) if compress else chunks
@@ -1,8 +1,104 @@
+import asyncio
+import logging
+import time
+
 import httpx
 
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.timing import span
+
+logger = logging.getLogger(__name__)
+
+# Served when the provider is failing (or the breaker is open) and there is
+# no cached response to fall back on.
+DEGRADED_QUOTE = {"content": None, "author": None, "degraded": True}
+
+_client: httpx.AsyncClient | None = None
+_cached: tuple[float, dict] | None = None  # (expires_at, quote)
+_refresh_lock = asyncio.Lock()
+_last_refresh_failed = False
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.external_breaker_failures,
+    reset_timeout=settings.external_breaker_reset_seconds,
+)
+
+
+# Shared client, created in the app lifespan like the Redis client: pooled,
+# kept-alive connections (HTTP/2 where the provider offers it) instead of a
+# new DNS + TCP + TLS handshake per enrich call.
+async def init_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=settings.external_http2,
+            timeout=httpx.Timeout(
+                settings.external_timeout_seconds,
+                connect=settings.external_connect_timeout_seconds,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.external_max_connections,
+                max_keepalive_connections=settings.external_max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def reset_quote_cache() -> None:
+    global _cached, _last_refresh_failed
+    _cached = None
+    _last_refresh_failed = False
+
+
 async def fetch_quote() -> dict:
     # Simple public API; if it ever changes, swap provider later.
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get("https://api.quotable.io/random")
+    if _cached is not None and _cached[0] > time.monotonic():
+        return _cached[1]
+
+    # While the provider is failing, callers do not queue behind the next
+    # attempt (each would wait out its timeout until the breaker opens):
+    # they get the stale or degraded quote straight away.
+    if _last_refresh_failed and _refresh_lock.locked():
+        return _cached[1] if _cached is not None else DEGRADED_QUOTE
+
+    # One upstream call refreshes the cache for all concurrent callers.
+    with span("external"):
+        async with _refresh_lock:
+            if _cached is not None and _cached[0] > time.monotonic():
+                return _cached[1]
+            return await _refresh_quote()
+
+
+async def _refresh_quote() -> dict:
+    global _cached, _last_refresh_failed
+    stale = _cached[1] if _cached is not None else None
+
+    if not breaker.allow():
+        return stale or DEGRADED_QUOTE
+
+    try:
+        client = await init_http_client()
+        resp = await client.get(settings.external_quote_url)
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        quote = resp.json()
+    except (httpx.HTTPError, ValueError) as e:
+        breaker.record_failure()
+        _last_refresh_failed = True
+        logger.warning(
+            {"external": "quote_failed", "error": repr(e), "breaker": breaker.state}
+        )
+        return stale or DEGRADED_QUOTE
+
+    breaker.record_success()
+    _last_refresh_failed = False
+    _cached = (time.monotonic() + settings.external_cache_ttl_seconds, quote)
+    return quote
@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import IO, AsyncIterator, Callable, Iterator
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import (
+    cache_delete_key,
+    cache_invalidate_prefix,
+    cache_mark_written,
+    item_cache_key,
+    safe_cache_call,
+)
+from app.core.config import settings
+from app.core.events import publish_item_event
+from app.db import crud, crud_async
+from app.schemas.items import ItemCreate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    rejected: int = 0
+    # Rows replaced by a later row with the same sku in the same batch.
+    duplicates: int = 0
+    # Only the first settings.import_max_errors rejections are kept.
+    errors: list[dict] = field(default_factory=list)
+
+    def reject(self, line: int, message: str) -> None:
+        self.processed += 1
+        self.rejected += 1
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append({"line": line, "message": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "errors": self.errors,
+        }
+
+
+def validation_message(e: ValidationError) -> str:
+    err = e.errors()[0]
+    loc = ".".join(str(part) for part in err["loc"])
+    return f"{loc}: {err['msg']}" if loc else err["msg"]
+
+
+class _StreamReader(io.RawIOBase):
+    # Blocking file over an async byte stream, for the parser running in the
+    # threadpool: each read pulls the next chunk on the event loop, so the
+    # body is only read as fast as batches are written.
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks
+        self._loop = loop
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = asyncio.run_coroutine_threadsafe(self._next(), self._loop).result()
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    async def _next(self) -> bytes | None:
+        return await anext(self._chunks, None)
+
+
+def stream_text(chunks: AsyncIterator[bytes]) -> IO[str]:
+    # Text file for import_items over e.g. request.stream(). Call it on the
+    # event loop; it must only be read from another thread.
+    raw = _StreamReader(chunks, asyncio.get_running_loop())
+    return io.TextIOWrapper(
+        io.BufferedReader(raw), encoding="utf-8", errors="replace", newline=""
+    )
+
+
+def _iter_rows(fileobj: IO[str], fmt: str) -> Iterator[tuple[int, dict | None]]:
+    # (line number, raw row); None marks an NDJSON line that is not an object.
+    if fmt == "csv":
+        reader = csv.DictReader(fileobj)
+        for row in reader:
+            # Empty CSV cells mean "no value" (e.g. category).
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in row.items()}
+        return
+
+    for line_num, line in enumerate(fileobj, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+def _iter_batches(fileobj: IO[str], fmt: str, report: ImportReport):
+    # Validated rows, settings.import_batch_size distinct skus at a time;
+    # rejected rows go straight into the report. Only one batch is held in
+    # memory. A sku repeated within a batch keeps its last row.
+    batch: dict[str, tuple[int, dict]] = {}
+    for line_num, raw in _iter_rows(fileobj, fmt):
+        if raw is None:
+            report.reject(line_num, "Invalid JSON object")
+            continue
+        try:
+            item = ItemCreate.model_validate(raw)
+        except ValidationError as e:
+            report.reject(line_num, validation_message(e))
+            continue
+
+        row = item.model_dump()
+        if row["sku"] in batch:
+            report.processed += 1
+            report.duplicates += 1
+        batch[row["sku"]] = (line_num, row)
+        if len(batch) >= settings.import_batch_size:
+            yield list(batch.values())
+            batch = {}
+
+    if batch:
+        yield list(batch.values())
+
+
+async def import_items(
+    db,
+    fileobj: IO[str],
+    fmt: str,
+    on_progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    # Parsing runs in the threadpool one batch at a time and the next batch
+    # is only read once the previous one is committed, so a slow database
+    # throttles the reader instead of rows piling up in memory. Rows are
+    # upserted on sku, one transaction per batch.
+    report = ImportReport()
+    batches = _iter_batches(fileobj, fmt, report)
+
+    while (batch := await run_in_threadpool(next, batches, None)) is not None:
+        try:
+            written = await crud_async.dispatch(
+                db, crud.upsert_items, [row for _, row in batch]
+            )
+        except SQLAlchemyError as e:
+            logger.warning({"import": "batch_failed", "rows": len(batch), "error": repr(e)})
+            for line_num, _ in batch:
+                report.reject(line_num, "Batch was rolled back")
+            continue
+
+        created_ids, updated_ids = [], []
+        for _, row in batch:
+            item_id, created = written[row["sku"]]
+            report.processed += 1
+            if created:
+                report.created += 1
+                created_ids.append(item_id)
+            else:
+                report.updated += 1
+                updated_ids.append(item_id)
+
+        await safe_cache_call(
+            cache_delete_key, *(item_cache_key(item_id) for item_id in updated_ids)
+        )
+        await safe_cache_call(
+            cache_mark_written, *(item_cache_key(item_id) for item_id in created_ids)
+        )
+        logger.info({
+            "import": "progress",
+            "processed": report.processed,
+            "created": report.created,
+            "updated": report.updated,
+            "rejected": report.rejected,
+        })
+        if on_progress:
+            on_progress(report)
+
+    if report.created or report.updated:
+        await safe_cache_call(
+            cache_invalidate_prefix,
+            "items_list",
+        )
+        await publish_item_event("bulk")
+    return report
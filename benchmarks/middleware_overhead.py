@@ -0,0 +1,134 @@
+"""Per-request overhead of the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Drives each stack directly through the ASGI interface (no network, no HTTP
+client) around a trivial JSON endpoint, with the rate limiter in local mode
+so Redis latency does not drown the difference.
+
+    python -m benchmarks.middleware_overhead [requests]
+"""
+import asyncio
+import logging
+import sys
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+
+settings.rate_limit_mode = "local"
+settings.rate_limit_requests = 10**9
+
+from app.core import rate_limit  # noqa: E402
+from app.core.logging import AccessLogMiddleware  # noqa: E402
+from app.core.rate_limit import RateLimitMiddleware  # noqa: E402
+from app.core.request_id import RequestIDMiddleware  # noqa: E402
+
+logger = logging.getLogger("bench")
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+
+# The stack as it was before: three BaseHTTPMiddleware-style layers.
+class LegacyRequestID(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        result = await rate_limit._decide(rate_limit._client_key(request))
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        response.headers["X-RateLimit-Reset"] = str(result.reset)
+        return response
+
+
+class LegacyAccessLog(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        logger.info(
+            {
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": round((time.time() - start_time) * 1000, 2),
+                "request_id": getattr(request.state, "request_id", None),
+            }
+        )
+        return response
+
+
+async def endpoint(request: Request):
+    return JSONResponse({"ok": True})
+
+
+def build(stack: str) -> Starlette:
+    app = Starlette(routes=[Route("/v1/items", endpoint)])
+    if stack == "legacy":
+        app.add_middleware(LegacyRequestID)
+        app.add_middleware(LegacyRateLimit)
+        app.add_middleware(LegacyAccessLog)
+    else:
+        app.add_middleware(RequestIDMiddleware)
+        app.add_middleware(RateLimitMiddleware)
+        app.add_middleware(AccessLogMiddleware, logger=logger)
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/v1/items",
+    "raw_path": b"/v1/items",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def run(app: Starlette, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(SCOPE), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    results = {}
+    for stack in ("legacy", "asgi"):
+        per_request = asyncio.run(run(build(stack), requests))
+        results[stack] = per_request
+        print(f"{stack:>6}: {per_request * 1e6:8.1f} us/request  ({1 / per_request:,.0f} req/s)")
+
+    saved = results["legacy"] - results["asgi"]
+    print(f" saved: {saved * 1e6:8.1f} us/request  ({saved / results['legacy']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
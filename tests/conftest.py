@@ -1,16 +1,147 @@
+import json
+import os
 import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import pytest
 
+# The whole suite shares one client IP; keep the limiter out of the way.
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "100000")
+
 # Add project root to PYTHONPATH
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from app.main import app
+from app.core import cache, redis_client
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.migrations import run_migrations
+from app.db.session import engine
+from app.services import external
 
 
 @pytest.fixture(scope="session")
 def client():
     with TestClient(app) as client:
-        yield client
\ No newline at end of file
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    credentials = {"email": "testuser@example.com", "password": "StrongPass123"}
+    client.post("/v1/auth/register", json=credentials)
+    login = client.post("/v1/auth/login", json=credentials)
+    assert login.status_code == 200
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    token = create_access_token({"sub": "admin-test", "role": "admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class ItemFactory:
+    # create_item(**overrides) POSTs an item (fresh sku unless given) and
+    # returns its JSON; create_item.body(**overrides) only builds the body.
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+
+    def body(self, **overrides) -> dict:
+        body = {
+            "sku": f"SKU-{uuid.uuid4().hex[:10]}",
+            "name": "Widget",
+            "category": "tools",
+            "quantity": 3,
+            "price": 9.5,
+        }
+        body.update(overrides)
+        return body
+
+    def __call__(self, **overrides) -> dict:
+        response = self.client.post("/v1/items", json=self.body(**overrides), headers=self.headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+
+
+@pytest.fixture
+def create_item(client, auth_headers):
+    return ItemFactory(client, auth_headers)
+
+
+@pytest.fixture
+def seed_legacy_items():
+    # Rows as the old CURRENT_TIMESTAMP server default wrote them (no
+    # fractional seconds), then the startup migration run over them.
+    def seed(prefix: str, stamp: str, count: int = 3) -> list[str]:
+        ids = [f"{prefix}-{i}" for i in range(count)]
+        with engine.begin() as conn:
+            for item_id in ids:
+                conn.execute(
+                    text(
+                        "INSERT INTO items (id, sku, name, category, quantity, price, is_active,"
+                        " created_at, updated_at) VALUES (:id, :id, 'Legacy', :category, 1, 1.0, 1,"
+                        " :stamp, :stamp)"
+                    ),
+                    {"id": item_id, "category": prefix, "stamp": stamp},
+                )
+            conn.execute(text("PRAGMA user_version = 0"))
+        run_migrations(engine)
+        return ids
+
+    return seed
+
+
+@pytest.fixture
+def fresh_redis(monkeypatch):
+    # The app's client is bound to the TestClient event loop; tests driving
+    # coroutines with asyncio.run() need their own, and their own
+    # invalidation listener.
+    monkeypatch.setattr(redis_client, "_redis", None)
+    monkeypatch.setattr(cache, "_listener_task", None)
+
+
+class _QuoteStub(BaseHTTPRequestHandler):
+    calls = 0
+    fail = False
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({"content": "Stub quote", "author": "Stub"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def quote_stub(monkeypatch):
+    # Local stand-in for the quote provider; tests flip `fail` and read `calls`.
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _QuoteStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _QuoteStub.calls = 0
+    _QuoteStub.fail = False
+    monkeypatch.setattr(
+        settings, "external_quote_url", f"http://127.0.0.1:{server.server_port}/random"
+    )
+    external.breaker.reset()
+    external.reset_quote_cache()
+    yield _QuoteStub
+    server.shutdown()
+    server.server_close()
+    external.breaker.reset()
+    external.reset_quote_cache()
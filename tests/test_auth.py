@@ -1,3 +1,8 @@
+import jwt
+
+from app.core.security import ALGORITHM, SECRET_KEY, create_access_token
+
+
 def test_register_user(client):
     response = client.post(
         "/v1/auth/register",
@@ -28,4 +33,22 @@ def test_login_user(client):
 
     data = response.json()
     assert "access_token" in data
-    assert data["token_type"] == "bearer"
\ No newline at end of file
+    assert data["token_type"] == "bearer"
+
+
+def test_logout_revokes_token(client):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'logout-test', 'role': 'user'})}"}
+    assert client.get("/v1/items", headers=headers).status_code == 200
+
+    assert client.post("/v1/auth/logout", headers=headers).status_code == 204
+    response = client.get("/v1/items", headers=headers)
+    assert response.status_code == 401
+
+
+def test_logout_refuses_token_without_jti(client):
+    token = jwt.encode({"sub": "logout-test", "role": "user", "exp": 4102444800}, SECRET_KEY, algorithm=ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/v1/auth/logout", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "BAD_REQUEST"
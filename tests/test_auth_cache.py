@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from app.core import auth_dependencies, redis_client
+from app.core.auth_cache import RevocationList, TokenCache
+from app.core.security import create_access_token, decode_token
+
+
+def test_verified_tokens_skip_decode(client, monkeypatch):
+    calls = []
+
+    def counting_decode(token):
+        calls.append(token)
+        return decode_token(token)
+
+    monkeypatch.setattr(auth_dependencies, "decode_token", counting_decode)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'cache-test', 'role': 'user'})}"}
+    for _ in range(3):
+        assert client.get("/v1/items", headers=headers).status_code == 200
+    assert len(calls) == 1
+
+
+def test_token_cache_bounds_and_expiry():
+    cache = TokenCache(max_entries=2)
+    cache.set("a", {"exp": time.time() + 60})
+    cache.set("b", {"exp": time.time() - 1})
+    cache.set("c", {"exp": time.time() + 60})
+    assert len(cache) == 2
+    assert cache.get("a") is None  # evicted (least recently used)
+    assert cache.get("b") is None  # expired
+    assert cache.get("c") is not None
+
+
+def test_revocations_from_other_workers_are_synced(fresh_redis):
+    async def scenario():
+        worker_a, worker_b = RevocationList(), RevocationList()
+        payload = {"jti": "synced-jti", "exp": time.time() + 60}
+        await worker_a.revoke(payload)
+        assert worker_a.is_revoked(payload)
+        assert not worker_b.is_revoked(payload)
+
+        await worker_b.sync()
+        assert worker_b.is_revoked(payload)
+        assert not worker_b.is_revoked({"jti": "other", "exp": payload["exp"]})
+
+        await redis_client.close_redis()
+
+    asyncio.run(scenario())
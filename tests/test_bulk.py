@@ -0,0 +1,81 @@
+import uuid
+
+import orjson
+
+from app.core.config import settings
+
+
+def test_bulk_upsert_array_reports_each_row(client, auth_headers, monkeypatch, create_item):
+    monkeypatch.setattr(settings, "bulk_chunk_size", 2)
+    prefix = uuid.uuid4().hex[:8]
+    existing = create_item(sku=f"{prefix}-0")
+    client.get(f"/v1/items/{existing['id']}", headers=auth_headers)  # prime the item cache
+
+    rows = [
+        create_item.body(sku=f"{prefix}-0", quantity=7),
+        create_item.body(sku=f"{prefix}-1"),
+        {"sku": f"{prefix}-2", "name": "No price"},
+        create_item.body(sku=f"{prefix}-3"),
+    ]
+    response = client.post("/v1/items/bulk", json=rows, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [r["status"] for r in body["results"]] == ["updated", "created", "error", "created"]
+    assert body["results"][0]["id"] == existing["id"]
+    assert body["results"][2]["error"]["code"] == "VALIDATION_ERROR"
+    assert body["summary"] == {"updated": 1, "created": 2, "error": 1}
+
+    # The single-item cache for the upserted row was dropped.
+    item = client.get(f"/v1/items/{existing['id']}", headers=auth_headers).json()
+    assert item["quantity"] == 7
+
+
+def test_bulk_upsert_ndjson_then_update_and_delete(client, auth_headers, admin_headers, create_item):
+    prefix = uuid.uuid4().hex[:8]
+    lines = [orjson.dumps(create_item.body(sku=f"{prefix}-{i}")) for i in range(3)] + [b"{not json"]
+    response = client.post(
+        "/v1/items/bulk",
+        content=b"\n".join(lines) + b"\n",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["created"] * 3 + ["error"]
+    ids = [r["id"] for r in results[:3]]
+
+    response = client.patch(
+        "/v1/items/bulk",
+        json=[{"id": ids[0], "price": 99.0}, {"id": "missing", "price": 1.0}, {"id": ids[1], "name": None}],
+        headers=auth_headers,
+    )
+    statuses = [r["status"] for r in response.json()["results"]]
+    assert statuses == ["updated", "error", "error"]
+    assert client.get(f"/v1/items/{ids[0]}", headers=auth_headers).json()["price"] == 99.0
+
+    response = client.request(
+        "DELETE", "/v1/items/bulk", json={"ids": ids + ["missing"]}, headers=admin_headers
+    )
+    assert response.json()["summary"] == {"deleted": 3, "error": 1}
+    assert client.get(f"/v1/items/{ids[0]}", headers=auth_headers).status_code == 404
+
+
+def test_bulk_reports_repeated_rows_once(client, auth_headers, admin_headers, create_item):
+    sku = f"dup-{uuid.uuid4().hex[:8]}"
+    rows = [create_item.body(sku=sku, quantity=1), create_item.body(sku=sku, quantity=2)]
+    body = client.post("/v1/items/bulk", json=rows, headers=auth_headers).json()
+    assert body["summary"] == {"created": 1, "error": 1}
+    assert body["results"][0]["error"]["code"] == "DUPLICATE"
+    item_id = body["results"][1]["id"]
+    assert client.get(f"/v1/items/{item_id}", headers=auth_headers).json()["quantity"] == 2
+
+    # A patch that changes nothing is rejected rather than reported as updated.
+    body = client.patch("/v1/items/bulk", json=[{"id": item_id}], headers=auth_headers).json()
+    assert body["results"][0]["error"]["code"] == "VALIDATION_ERROR"
+
+    response = client.request(
+        "DELETE", "/v1/items/bulk", json={"ids": [item_id, item_id]}, headers=admin_headers
+    )
+    body = response.json()
+    assert body["summary"] == {"deleted": 1, "error": 1}
+    assert [r["status"] for r in body["results"]] == ["error", "deleted"]
@@ -0,0 +1,141 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.core import redis_client
+from app.core.cache import (
+    cache_get,
+    cache_delete_key,
+    cache_get_key,
+    cache_get_or_compute,
+    cache_invalidate_prefix,
+    cache_set,
+    cache_set_key,
+    item_cache_key,
+)
+from app.core.redis_client import close_redis
+
+
+def _request(query: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/v1/items/",
+            "query_string": query.encode(),
+            "headers": [],
+        }
+    )
+
+
+def test_cache_invalidation_bumps_generation(fresh_redis):
+    async def scenario():
+        prefix = "test_generation"
+        request = _request("limit=5")
+        await cache_get(request, prefix)
+        await cache_set(request, prefix, [{"id": "1"}])
+        assert await cache_get(_request("limit=5"), prefix) == [{"id": "1"}]
+
+        await cache_invalidate_prefix(prefix)
+        assert await cache_get(_request("limit=5"), prefix) is None
+
+        # A value computed before the invalidation is written under the old
+        # generation and stays invisible.
+        await cache_set(request, prefix, [{"id": "stale"}])
+        assert await cache_get(_request("limit=5"), prefix) is None
+        await close_redis()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_compute_once(fresh_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return ["fresh"]
+
+    async def scenario():
+        prefix = "test_single_flight"
+        await cache_invalidate_prefix(prefix)
+        results = await asyncio.gather(
+            *[cache_get_or_compute(_request("q=1"), prefix, compute) for _ in range(10)]
+        )
+        await close_redis()
+        return results
+
+    assert asyncio.run(scenario()) == [["fresh"]] * 10
+    assert calls == 1
+
+
+def test_locked_miss_serves_stale_value(fresh_redis):
+    async def compute():
+        raise AssertionError("lock holder is recomputing; must not hit the DB")
+
+    async def scenario():
+        prefix = "test_stale"
+        await cache_invalidate_prefix(prefix)
+        request = _request("q=2")
+        await cache_get(request, prefix)
+        await cache_set(request, prefix, ["previous"])
+
+        # Fresh entry expires; another process holds the recompute lock.
+        r = await redis_client.init_redis()
+        generation = await r.get(f"cache:{prefix}:gen")
+        keys = [k async for k in r.scan_iter(match=f"cache:{prefix}:{generation}:*")]
+        fresh = next(k for k in keys if not k.endswith(":stale"))
+        await r.delete(fresh)
+        await r.set(f"{fresh}:lock", "other-process", px=5000)
+
+        result = await cache_get_or_compute(_request("q=2"), prefix, compute)
+        await close_redis()
+        return result
+
+    assert asyncio.run(scenario()) == ["previous"]
+
+
+def test_item_read_racing_an_update_does_not_restore_old_value(fresh_redis):
+    async def scenario():
+        key = item_cache_key("race")
+        await cache_delete_key(key)
+
+        # Reader misses and loads the row; the update commits and
+        # invalidates before the reader stores what it loaded.
+        cached, version, _ = await cache_get_key(key)
+        assert cached is None
+        await cache_delete_key(key)
+        assert await cache_set_key(key, {"quantity": 1}, version) is False
+        assert (await cache_get_key(key))[0] is None
+
+        # A read that starts after the update fills the cache as usual.
+        _, version, _ = await cache_get_key(key)
+        assert await cache_set_key(key, {"quantity": 2}, version) is True
+        assert (await cache_get_key(key))[0] == {"quantity": 2}
+        await close_redis()
+
+    asyncio.run(scenario())
+
+
+def test_miss_after_invalidation_does_not_join_older_computation(fresh_redis):
+    values = iter([["before write"], ["after write"]])
+
+    async def compute():
+        value = next(values)
+        await asyncio.sleep(0.1)
+        return value
+
+    async def scenario():
+        prefix = "test_single_flight_generation"
+        await cache_invalidate_prefix(prefix)
+        first = asyncio.ensure_future(cache_get_or_compute(_request("q=3"), prefix, compute))
+        await asyncio.sleep(0.02)  # first miss is computing
+
+        await cache_invalidate_prefix(prefix)  # a write lands meanwhile
+        second = await cache_get_or_compute(_request("q=3"), prefix, compute)
+        results = [await first, second]
+        await close_redis()
+        return results
+
+    assert asyncio.run(scenario()) == [["before write"], ["after write"]]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import hash_password
+from app.db import crud, crud_async
+from app.db.session import Base
+from app.schemas.items import ItemCreate, ItemUpdate
+
+
+def test_crud_async_variants(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            created = await crud_async.dispatch(
+                db,
+                crud.create_item,
+                ItemCreate(sku="ASYNC-1", name="Async", category="a", quantity=1, price=2.5),
+            )
+            fetched = await crud_async.dispatch(db, crud.get_item, created.id)
+            assert fetched.sku == "ASYNC-1"
+
+            updates = ItemUpdate(
+                name="Async", category="a", quantity=7, price=2.5, is_active=True
+            )
+            updated = await crud_async.dispatch(db, crud.update_item, fetched, updates)
+            assert updated.quantity == 7
+
+            items, next_cursor = await crud_async.dispatch(
+                db, crud.get_items_page, 10, "a", "-price", ""
+            )
+            assert [i.id for i in items] == [created.id]
+            assert next_cursor is None
+
+            await crud_async.dispatch(db, crud.delete_item, updated)
+            assert await crud_async.dispatch(db, crud.get_items, 0, 10) == []
+
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_users_take_hashed_password_by_keyword(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(engine)
+    hashed = hash_password("StrongPass123")
+
+    with sessionmaker(engine, expire_on_commit=False)() as db:
+        with pytest.raises(TypeError):
+            crud.create_user(db, "plain@example.com", "StrongPass123")
+        crud.create_user(db, "user@example.com", hashed_password=hashed)
+
+        assert crud.authenticate_user(db, "user@example.com", "StrongPass123").email == "user@example.com"
+        assert crud.authenticate_user(db, "user@example.com", "wrong") is None
+    engine.dispose()
+
+    async def scenario():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+        async with async_sessionmaker(async_engine)() as db:
+            user = await crud_async.dispatch(db, crud.authenticate_user, "user@example.com", "StrongPass123")
+            assert user is not None
+            assert await crud_async.dispatch(db, crud.authenticate_user, "nobody@example.com", "x") is None
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_every_crud_function_has_async_variant():
+    for name in dir(crud):
+        fn = getattr(crud, name)
+        if not callable(fn) or getattr(fn, "__module__", None) != crud.__name__:
+            continue
+        if name.endswith(("_stmt", "_result")):
+            continue
+        assert fn in crud_async._VARIANTS, name
@@ -0,0 +1,66 @@
+import asyncio
+
+import orjson
+
+from app.core import events
+from app.core.config import settings
+
+
+def test_events_are_pushed_to_matching_subscribers(fresh_redis):
+    async def scenario():
+        hub = events.EventHub()
+        tools = events.sse_stream(hub, "tools")
+        everything = events.sse_stream(hub)
+        assert await anext(tools) == b"retry: 3000\n\n"
+        assert await anext(everything) == b"retry: 3000\n\n"
+        await asyncio.sleep(0.2)  # let the hub subscribe
+
+        await events.publish_item_event("created", "1", "garden")
+        await events.publish_item_event("updated", "2", "garden", previous_category="tools")
+
+        first = await asyncio.wait_for(anext(everything), 5)
+        assert orjson.loads(first.split(b"data: ")[1]) == {"op": "created", "id": "1", "category": "garden"}
+        moved = await asyncio.wait_for(anext(tools), 5)
+        assert b'"id":"2"' in moved
+
+        await tools.aclose()
+        assert hub._task is not None
+        listener = hub._task
+        await everything.aclose()
+        assert len(hub) == 0
+        # The last subscriber leaving ends the Redis subscription.
+        assert hub._task is None
+        await asyncio.wait([listener], timeout=5)
+        assert listener.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped(monkeypatch):
+    monkeypatch.setattr(settings, "events_queue_size", 2)
+
+    async def scenario():
+        hub = events.EventHub()
+        # no Redis listener needed
+        monkeypatch.setattr(hub, "_task", asyncio.get_running_loop().create_future())
+        stream = events.sse_stream(hub)
+        await anext(stream)
+
+        for i in range(3):
+            hub.dispatch(orjson.dumps({"op": "created", "id": str(i), "category": None}))
+
+        assert len(hub) == 0
+        assert await anext(stream) == b"event: dropped\ndata: {}\n\n"
+
+    asyncio.run(scenario())
+
+
+def test_publish_failures_are_logged_not_raised(monkeypatch, caplog):
+    async def unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(events, "init_redis", unavailable)
+    asyncio.run(events.publish_item_event("deleted", "1", "tools"))
+
+    assert "publish_failed" in caplog.text
+    assert "Cache unavailable" not in caplog.text
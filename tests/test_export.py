@@ -0,0 +1,50 @@
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta, UTC
+
+import orjson
+
+
+def test_export_ndjson_filters_by_category(client, auth_headers, create_item):
+    category = f"export-{uuid.uuid4().hex[:8]}"
+    for i in range(3):
+        create_item(sku=f"{category}-{i}", category=category, quantity=i)
+
+    response = client.get(
+        "/v1/items/export",
+        params={"category": category},
+        headers={**auth_headers, "Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert sorted(row["sku"] for row in rows) == [f"{category}-{i}" for i in range(3)]
+
+    future = (datetime.now(UTC) + timedelta(hours=1)).isoformat()
+    response = client.get(
+        "/v1/items/export",
+        params={"category": category, "updated_since": future},
+        headers=auth_headers,
+    )
+    assert response.content == b""
+
+
+def test_export_csv_is_gzipped(client, auth_headers, create_item):
+    category = f"export-{uuid.uuid4().hex[:8]}"
+    for i in range(2):
+        create_item(sku=f"{category}-{i}", category=category, quantity=i)
+
+    response = client.get(
+        "/v1/items/export",
+        params={"format": "csv", "category": category},
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))  # decoded by httpx
+    assert sorted(row["sku"] for row in rows) == [f"{category}-{i}" for i in range(2)]
+    assert rows[0]["category"] == category
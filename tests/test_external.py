@@ -0,0 +1,81 @@
+import asyncio
+
+from app.core.config import settings
+from app.services import external
+from app.services.external import DEGRADED_QUOTE, breaker, reset_quote_cache
+
+
+def test_enrich_item_reuses_cached_quote(client, auth_headers, quote_stub, create_item):
+    item_id = create_item(name="Enrich me")["id"]
+
+    for _ in range(3):
+        response = client.get(f"/v1/items/{item_id}/enrich", headers=auth_headers)
+        assert response.status_code == 200
+        external = response.json()["external"]
+        assert external == {"quote": "Stub quote", "author": "Stub", "degraded": False}
+
+    assert quote_stub.calls == 1
+
+
+def test_enrich_item_degrades_and_breaker_opens(client, auth_headers, quote_stub, create_item):
+    item_id = create_item(name="Enrich me")["id"]
+    quote_stub.fail = True
+
+    for _ in range(settings.external_breaker_failures + 3):
+        response = client.get(f"/v1/items/{item_id}/enrich", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["external"]["degraded"] is True
+
+    # Once open, the breaker stops calling the failing provider.
+    assert breaker.state == "open"
+    assert quote_stub.calls == settings.external_breaker_failures
+
+
+def test_callers_do_not_wait_on_a_refresh_after_a_failure(quote_stub, monkeypatch):
+    monkeypatch.setattr(external, "_refresh_lock", asyncio.Lock())
+    quote_stub.fail = True
+
+    async def scenario():
+        assert await external.fetch_quote() == DEGRADED_QUOTE
+        # Another caller's refresh is in flight: answer without queueing.
+        async with external._refresh_lock:
+            return await asyncio.wait_for(external.fetch_quote(), timeout=1)
+
+    assert asyncio.run(scenario()) == DEGRADED_QUOTE
+    assert quote_stub.calls == 1
+
+
+def test_enrich_items_batch_returns_partial_results(client, auth_headers, quote_stub, create_item):
+    first = create_item(name="Batch one")["id"]
+    second = create_item(name="Batch two")["id"]
+
+    response = client.post(
+        "/v1/items/enrich",
+        json={"item_ids": [first, "missing-id", second, first]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["item_id"] for r in results] == [first, "missing-id", second]
+    assert results[0]["item"]["name"] == "Batch one"
+    assert results[0]["external"]["quote"] == "Stub quote"
+    assert results[1]["error"]["code"] == "NOT_FOUND"
+    assert results[2]["item"]["name"] == "Batch two"
+    assert quote_stub.calls == 1
+
+    # Nothing to enrich: no upstream call, even with the quote cache empty.
+    reset_quote_cache()
+    response = client.post("/v1/items/enrich", json={"item_ids": ["missing-id"]}, headers=auth_headers)
+    assert response.json()["results"][0]["error"]["code"] == "NOT_FOUND"
+    assert quote_stub.calls == 1
+
+
+def test_enrich_items_batch_limit(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "enrich_batch_max_items", 2)
+    response = client.post(
+        "/v1/items/enrich",
+        json={"item_ids": ["a", "b", "c"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
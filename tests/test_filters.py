@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.db import crud
+from app.db.session import SessionLocal
+from app.schemas.items import ItemFilters
+
+
+def test_list_items_filters(client, auth_headers):
+    category = f"filters-{uuid.uuid4().hex[:8]}"
+    for i, (quantity, price, active) in enumerate([(0, 5.0, True), (3, 15.0, True), (50, 25.0, False)]):
+        body = {"sku": f"{category}-{i}", "name": f"F{i}", "category": category, "quantity": quantity, "price": price}
+        created = client.post("/v1/items", json=body, headers=auth_headers).json()
+        if not active:
+            body.pop("sku")
+            client.patch(f"/v1/items/{created['id']}", json={**body, "is_active": False}, headers=auth_headers)
+
+    def skus(**params):
+        response = client.get("/v1/items", params={"category": category, **params}, headers=auth_headers)
+        assert response.status_code == 200
+        return [item["sku"] for item in response.json()]
+
+    assert skus(min_price=10, sort="price") == [f"{category}-1", f"{category}-2"]
+    assert skus(is_active="true", max_quantity=5, sort="-quantity") == [f"{category}-1", f"{category}-0"]
+    assert skus(is_active="false") == [f"{category}-2"]
+    assert skus(created_after="2100-01-01T00:00:00Z") == []
+    assert len(skus(sort="id")) == len(skus(sort="-id")) == 3
+
+    response = client.get("/v1/items", params={"sort": "hashed_password"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def _plan(stmt) -> str:
+    with SessionLocal() as db:
+        sql = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+_SORTS = sorted(crud.SORT_FIELDS) + [f"-{f}" for f in sorted(crud.SORT_FIELDS)]
+
+_FILTERS = [
+    {"category": "tools"},
+    {"min_price": 1, "max_price": 10},
+    {"min_quantity": 5},
+    {"max_quantity": 5},
+    {"is_active": True},
+    {"is_active": False},
+    {"is_active": True, "max_quantity": 5},
+    {"created_after": "2024-01-01T00:00:00"},
+    {"updated_before": "2024-01-01T00:00:00"},
+]
+
+
+def _stmts(filters: dict, sort: str | None):
+    filters = dict(filters)
+    category = filters.pop("category", None)
+    item_filters = ItemFilters(**filters)
+    return (
+        crud.items_stmt(category=category, sort=sort, filters=item_filters),
+        crud.items_page_stmt(category=category, sort=sort, filters=item_filters),
+    )
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [f for f in _FILTERS if f != {"is_active": True}],  # matches most rows
+)
+def test_filters_search_an_index(filters):
+    plan = _plan(_stmts(filters, None)[0])
+    assert "SEARCH items USING" in plan and "INDEX" in plan, plan
+
+
+@pytest.mark.parametrize("sort", _SORTS)
+def test_sorts_walk_an_index(sort):
+    for stmt in _stmts({}, sort):
+        plan = _plan(stmt)
+        assert "INDEX" in plan and "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.parametrize("sort", _SORTS)
+@pytest.mark.parametrize("filters", _FILTERS)
+def test_filter_and_sort_combinations_use_an_index(filters, sort):
+    for stmt in _stmts(filters, sort):
+        plan = _plan(stmt)
+        assert "INDEX" in plan, plan
+        # Never the whole table sorted: rows come off an index already in
+        # order, or an index first narrows them to the few that get sorted.
+        if "TEMP B-TREE" in plan:
+            assert "SEARCH" in plan, plan
+        # category has a (category, sort field, id) index for every sort.
+        if "category" in filters:
+            assert "SEARCH" in plan and "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.exceptions import ServiceUnavailableError
+from app.core.hash_pool import PasswordHashPool
+
+
+def test_password_pool_rejects_when_full():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+
+    async def scenario():
+        calls = [pool.run(time.sleep, 0.05) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    rejected = [r for r in results if isinstance(r, ServiceUnavailableError)]
+    assert len(rejected) == 1
+    assert pool.stats.submitted == 2
+    assert pool.stats.rejected == 1
+    # The queued call waited for the first one to finish.
+    assert pool.stats.wait_seconds_max >= 0.04
+    assert pool.pending == 0
+
+
+def test_password_pool_returns_result():
+    pool = PasswordHashPool(workers=2, max_queue=0)
+    try:
+        assert asyncio.run(pool.run(lambda a, b: a + b, 2, 3)) == 5
+    finally:
+        pool.shutdown()
+
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(pool.run(lambda: 1 / 0))
+    pool.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_hash_finishes():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+
+    async def scenario():
+        job = asyncio.ensure_future(pool.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        job.cancel()
+        await asyncio.sleep(0)
+
+        # The worker is still hashing: the pool must not accept more.
+        assert pool.pending == 1
+        with pytest.raises(ServiceUnavailableError):
+            await pool.run(time.sleep, 0)
+
+        await asyncio.sleep(0.15)
+        assert pool.pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_password_pool_wait_is_exported():
+    before = REGISTRY.get_sample_value("password_hash_wait_seconds_sum")
+    pool = PasswordHashPool(workers=1, max_queue=1)
+
+    async def scenario():
+        await asyncio.gather(pool.run(time.sleep, 0.05), pool.run(time.sleep, 0))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert REGISTRY.get_sample_value("password_hash_wait_seconds_sum") - before >= 0.04
@@ -0,0 +1,86 @@
+import uuid
+
+import orjson
+
+from app import import_items
+
+
+def test_import_csv_upload_reports_rejected_rows(client, auth_headers):
+    prefix = uuid.uuid4().hex[:8]
+    body = (
+        "sku,name,category,quantity,price\r\n"
+        f"{prefix}-1,First,,1,2.5\r\n"
+        f"{prefix}-2,Second,tools,-1,2.5\r\n"
+        f"{prefix}-3,\"Third, quoted\",tools,3,4\r\n"
+    )
+    response = client.post(
+        "/v1/items/import",
+        content=body.encode(),
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["processed"] == 3
+    assert report["created"] == 2
+    assert report["rejected"] == 1
+    assert report["errors"][0]["line"] == 3
+    assert report["errors"][0]["message"].startswith("quantity")
+
+    # Re-importing the same file updates instead of duplicating.
+    response = client.post(
+        "/v1/items/import?format=csv", content=body.encode(), headers=auth_headers
+    )
+    assert response.json()["updated"] == 2
+
+
+def test_import_keeps_last_row_of_a_repeated_sku(client, auth_headers):
+    sku = f"dup-{uuid.uuid4().hex[:8]}"
+    lines = [
+        orjson.dumps({"sku": sku, "name": f"Version {i}", "category": None, "quantity": i, "price": 1.0})
+        for i in range(3)
+    ]
+    response = client.post(
+        "/v1/items/import",
+        content=b"\n".join(lines),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    report = response.json()
+    assert (report["processed"], report["created"], report["duplicates"]) == (3, 1, 2)
+
+    found = client.get("/v1/items/search", params={"q": sku}, headers=auth_headers).json()["items"]
+    assert [item["name"] for item in found] == ["Version 2"]
+
+
+def test_import_parses_a_chunked_upload(client, auth_headers):
+    prefix = uuid.uuid4().hex[:8]
+    body = (
+        "sku,name,category,quantity,price\r\n"
+        f"{prefix}-1,\"Split\nacross chunks\",,1,2.5\r\n"
+        f"{prefix}-2,Second,,2,2.5\r\n"
+    ).encode()
+
+    def chunks():
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    response = client.post(
+        "/v1/items/import?format=csv", content=chunks(), headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+
+def test_import_cli_ndjson(tmp_path, fresh_redis, capsys):
+    prefix = uuid.uuid4().hex[:8]
+    path = tmp_path / "items.ndjson"
+    lines = [
+        orjson.dumps({"sku": f"{prefix}-{i}", "name": "CLI", "category": None, "quantity": i, "price": 1.0})
+        for i in range(3)
+    ]
+    path.write_bytes(b"\n".join(lines + [b"[1, 2]"]) + b"\n")
+
+    assert import_items.main([str(path)]) == 1  # one rejected row
+
+    report = orjson.loads(capsys.readouterr().out)
+    assert report["created"] == 3
+    assert report["errors"] == [{"line": 4, "message": "Invalid JSON object"}]
@@ -1,3 +1,9 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+
+
 def test_items_unauthorized(client):
     response = client.get("/v1/items")
     assert response.status_code == 401
@@ -19,4 +25,100 @@ def test_items_authorized(client):
 
     response = client.get("/v1/items", headers=headers)
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
\ No newline at end of file
+    assert isinstance(response.json(), list)
+
+
+def test_items_cursor_pagination(client, auth_headers):
+    category = f"cursor-{uuid.uuid4().hex[:8]}"
+    for i in range(5):
+        created = client.post(
+            "/v1/items",
+            json={
+                "sku": f"{category}-{i}",
+                "name": f"Item {i}",
+                "category": category,
+                "quantity": i,
+                "price": 10 + i,
+            },
+            headers=auth_headers,
+        )
+        assert created.status_code == 201
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(
+            "/v1/items",
+            params={"category": category, "sort": "-price", "limit": 2, "cursor": cursor},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["price"] for item in page["items"])
+        cursor = page["next_cursor"]
+
+    assert seen == [14, 13, 12, 11, 10]
+
+
+def test_items_invalid_cursor(client, auth_headers):
+    response = client.get(
+        "/v1/items",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_get_item_cache_is_invalidated_on_update(client, auth_headers, create_item):
+    item = create_item()
+    url = f"/v1/items/{item['id']}"
+
+    assert client.get(url, headers=auth_headers).json()["quantity"] == 3
+    updates = {
+        "name": "Widget",
+        "category": "tools",
+        "quantity": 8,
+        "price": 9.5,
+        "is_active": True,
+    }
+    patched = client.patch(url, json=updates, headers=auth_headers)
+    assert patched.status_code == 200
+    assert client.get(url, headers=auth_headers).json()["quantity"] == 8
+
+
+def test_get_item_raw_cached_bytes(client, auth_headers, monkeypatch, create_item):
+    monkeypatch.setattr(settings, "cache_raw_responses", True)
+    item = create_item()
+    url = f"/v1/items/{item['id']}"
+
+    first = client.get(url, headers=auth_headers)
+    second = client.get(url, headers=auth_headers)
+    assert first.status_code == second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert second.json() == first.json() == item
+
+
+def test_item_timestamps_are_aware_utc(client, auth_headers, create_item):
+    item = create_item()
+    fetched = client.get(f"/v1/items/{item['id']}", headers=auth_headers).json()
+
+    # Same rendering whether the value came from memory or the database.
+    assert fetched["created_at"] == item["created_at"]
+    assert datetime.fromisoformat(fetched["updated_at"]).utcoffset() == timedelta(0)
+
+
+def test_cursor_pages_through_legacy_timestamps(client, auth_headers, seed_legacy_items):
+    category = f"legacy-{uuid.uuid4().hex[:8]}"
+    ids = seed_legacy_items(category, "2001-01-01 00:00:00")
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get(
+            "/v1/items",
+            params={"category": category, "sort": "created_at", "limit": 1, "cursor": cursor},
+            headers=auth_headers,
+        ).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert seen == ids
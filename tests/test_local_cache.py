@@ -0,0 +1,55 @@
+import asyncio
+
+from app.core import cache, redis_client
+from app.core.config import settings
+from app.core.local_cache import LocalCache, local_cache
+
+
+def test_local_cache_evicts_lru_by_entries_and_bytes():
+    lru = LocalCache(max_entries=2, max_bytes=100, ttl_seconds=60)
+    lru.set("p", "p:a", "A", 10)
+    lru.set("p", "p:b", "B", 10)
+    assert lru.get("p:a") == "A"  # a is now most recently used
+    lru.set("p", "p:c", "C", 10)
+    assert lru.get("p:b") is None
+    assert len(lru) == 2
+
+    lru.set("p", "p:big", "X", 95)
+    assert lru.get("p:big") == "X"
+    assert lru.size_bytes <= 100
+    assert lru.get("p:a") is None
+
+
+def test_local_cache_ttl_and_epoch_guard():
+    lru = LocalCache(max_entries=10, max_bytes=1000, ttl_seconds=0)
+    lru.set("p", "p:a", "A", 1)
+    assert lru.get("p:a") is None
+
+    lru = LocalCache(max_entries=10, max_bytes=1000, ttl_seconds=60)
+    epoch = lru.epoch("p")
+    lru.invalidate_prefix("p")
+    lru.set("p", "p:a", "computed before invalidation", 1, epoch)
+    assert lru.get("p:a") is None
+
+
+def test_invalidation_is_broadcast_to_local_tier(fresh_redis, monkeypatch):
+    monkeypatch.setattr(settings, "local_cache_enabled", True)
+
+    async def scenario():
+        cache.start_cache_listener()
+        await asyncio.sleep(0.2)  # let the listener subscribe
+        local_cache.set("broadcast", "broadcast:key", "value", 5)
+
+        # Another worker invalidating: only the pub/sub message reaches us.
+        r = await redis_client.init_redis()
+        await r.publish(cache.INVALIDATION_CHANNEL, "broadcast")
+        for _ in range(50):
+            if local_cache.get("broadcast:key") is None:
+                break
+            await asyncio.sleep(0.05)
+
+        await cache.stop_cache_listener()
+        await redis_client.close_redis()
+
+    asyncio.run(scenario())
+    assert local_cache.get("broadcast:key") is None
@@ -0,0 +1,50 @@
+from app.core.config import settings
+
+
+def _sample(body: str, name: str, **labels) -> float:
+    for line in body.splitlines():
+        if not line.startswith(name + "{"):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_endpoint_exposes_request_cache_and_db_metrics(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    scrape = {"Authorization": "Bearer scrape-secret"}
+    before = client.get("/metrics", headers=scrape).text
+    client.get("/v1/items", headers=auth_headers)
+    client.get("/v1/items/does-not-exist", headers=auth_headers)
+    client.get("/v1/items/items", headers=auth_headers)  # id equal to a path segment
+
+    response = client.get("/metrics", headers=scrape)
+    assert response.status_code == 200
+    body = response.text
+
+    route = "/v1/items/{item_id}"
+    assert _sample(body, "http_request_duration_seconds_count", route=route, status="404") == (
+        _sample(before, "http_request_duration_seconds_count", route=route, status="404") + 2
+    )
+    assert _sample(body, "db_query_duration_seconds_count", statement="SELECT") > _sample(
+        before, "db_query_duration_seconds_count", statement="SELECT"
+    )
+    assert _sample(body, "cache_requests_total", prefix="item", result="miss") > _sample(
+        before, "cache_requests_total", prefix="item", result="miss"
+    )
+    assert _sample(body, "rate_limit_decisions_total", decision="allowed") > 0
+    assert "http_requests_in_flight" in body
+
+
+def test_metrics_are_not_served_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_token_is_required_when_set(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
@@ -0,0 +1,17 @@
+def test_request_id_is_echoed(client):
+    response = client.get("/v1/health", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+
+
+def test_request_id_is_generated(client):
+    response = client.get("/v1/health")
+    assert len(response.headers["X-Request-ID"]) == 36
+
+
+def test_rate_limit_headers_on_success(client, auth_headers):
+    response = client.get("/v1/items", headers=auth_headers)
+    assert response.status_code == 200
+    assert int(response.headers["X-RateLimit-Limit"]) > 0
+    assert "X-RateLimit-Remaining" in response.headers
+    assert "X-RateLimit-Reset" in response.headers
+    assert "X-Request-ID" in response.headers
@@ -0,0 +1,100 @@
+import logging
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v1.routes import auth
+from app.core.config import settings
+from app.core.timing import QueryStats, capture_queries
+from app.db.instrumentation import _explain
+
+
+def test_item_writes_and_reads_stay_within_query_budget(client, auth_headers):
+    with capture_queries() as captured:
+        created = client.post(
+            "/v1/items/",
+            json={"sku": uuid.uuid4().hex, "name": "Budget", "category": "q", "quantity": 1, "price": 2},
+            headers=auth_headers,
+        )
+        item_id = created.json()["id"]
+        updated = client.patch(
+            f"/v1/items/{item_id}",
+            json={"name": "Budget", "category": "q", "quantity": 3, "price": 2, "is_active": True},
+            headers=auth_headers,
+        )
+    assert created.status_code == 201
+    assert updated.json()["quantity"] == 3
+
+    # No reload after commit: INSERT alone, then SELECT + UPDATE.
+    create, update = captured
+    assert create.count == 1
+    assert update.count == 2
+
+
+def test_register_checks_email_before_hashing(client, monkeypatch):
+    hashed = []
+
+    async def fake_hash(password):
+        hashed.append(password)
+        return "hashed"
+
+    monkeypatch.setattr(auth, "hash_password_async", fake_hash)
+    email = f"{uuid.uuid4().hex}@example.com"
+    with capture_queries() as captured:
+        first = client.post("/v1/auth/register", json={"email": email, "password": "StrongPass123"})
+        second = client.post("/v1/auth/register", json={"email": email, "password": "StrongPass123"})
+
+    assert first.status_code == 201
+    assert second.status_code == 400
+    # Indexed lookup + INSERT, then the lookup alone; only one hash.
+    assert [stats.count for stats in captured] == [2, 1]
+    assert len(hashed) == 1
+
+
+def test_slow_queries_are_logged_with_plan(client, auth_headers, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        client.get(f"/v1/items/{uuid.uuid4()}", headers=auth_headers)
+
+    slow = [r.msg for r in caplog.records if isinstance(r.msg, dict) and "slow_query" in r.msg]
+    assert slow
+    assert isinstance(slow[0]["plan"], list) and slow[0]["plan"]
+
+
+def test_repeated_statements_are_flagged():
+    stats = QueryStats()
+    for _ in range(3):
+        stats.record("SELECT * FROM items WHERE id = ?", 0.001)
+    stats.record("SELECT 1", 0.001)
+
+    assert stats.count == 4
+    assert stats.repeated(3) == {"SELECT * FROM items WHERE id = ?": 3}
+
+
+def test_failed_explain_is_contained_in_a_savepoint():
+    executed = []
+
+    class Cursor:
+        def execute(self, sql, parameters=None):
+            executed.append(sql)
+            if sql.startswith("EXPLAIN"):
+                raise RuntimeError("explain failed")
+
+        def close(self):
+            pass
+
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connection=SimpleNamespace(cursor=Cursor),
+    )
+    with pytest.raises(RuntimeError):
+        _explain(conn, "SELECT 1", ())
+
+    # The request's transaction is left as it was before the EXPLAIN.
+    assert executed == [
+        "SAVEPOINT explain_slow_query",
+        "EXPLAIN SELECT 1",
+        "ROLLBACK TO SAVEPOINT explain_slow_query",
+        "RELEASE SAVEPOINT explain_slow_query",
+    ]
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+from app.core import rate_limit, redis_client
+from app.core.config import settings
+from app.core.rate_limit import LocalRateLimiter, check_rate_limit
+from app.core.redis_client import close_redis
+
+
+def _run(algorithm: str, limit: int, calls: int):
+    key = f"test-{uuid.uuid4().hex}"
+
+    async def scenario():
+        results = [
+            await check_rate_limit(key, limit, 60, algorithm=algorithm)
+            for _ in range(calls)
+        ]
+        r = await redis_client.init_redis()
+        stored = await r.type(f"rl:{algorithm}:{key}")
+        size = await r.zcard(f"rl:{algorithm}:{key}") if stored == "zset" else None
+        await close_redis()
+        return results, size
+
+    return asyncio.run(scenario())
+
+
+def test_sliding_window_counts_same_second_requests(fresh_redis):
+    results, size = _run("sliding_window", limit=3, calls=5)
+    assert [r.allowed for r in results] == [True, True, True, False, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0, 0]
+    # Denied requests are not recorded.
+    assert size == 3
+
+
+def test_gcra_allows_burst_then_denies(fresh_redis):
+    results, size = _run("gcra", limit=3, calls=5)
+    assert [r.allowed for r in results] == [True, True, True, False, False]
+    assert results[0].remaining == 2
+    assert size is None  # a single string key per client
+
+
+def test_local_limiter_denies_after_limit():
+    limiter = LocalRateLimiter()
+    results = [limiter.take("client", 3, 60) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[0].remaining == 2
+
+
+def test_hybrid_sync_drains_tokens_spent_by_other_workers(fresh_redis):
+    key = f"test-{uuid.uuid4().hex}"
+    worker_a, worker_b = LocalRateLimiter(), LocalRateLimiter()
+
+    async def scenario():
+        worker_a.take(key, 10, 60)
+        worker_b.take(key, 10, 60)
+        await worker_a.sync(60)
+        await worker_b.sync(60)
+        for _ in range(6):
+            worker_b.take(key, 10, 60)
+        await worker_b.sync(60)
+        await worker_a.sync(60)
+        await close_redis()
+
+    asyncio.run(scenario())
+    # 8 of 10 spent globally; worker A only admitted one itself.
+    assert worker_a.take(key, 10, 60).remaining <= 2
+
+
+def test_fail_closed_when_redis_unavailable(monkeypatch):
+    async def unavailable(**kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(rate_limit, "check_rate_limit", unavailable)
+    monkeypatch.setattr(settings, "rate_limit_mode", "redis")
+
+    monkeypatch.setattr(settings, "rate_limit_fail_open", False)
+    assert asyncio.run(rate_limit._decide("client-closed")) is None
+
+    monkeypatch.setattr(settings, "rate_limit_fail_open", True)
+    assert asyncio.run(rate_limit._decide("client-open")).allowed
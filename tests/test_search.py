@@ -0,0 +1,92 @@
+import uuid
+
+from sqlalchemy import create_engine, event, text
+
+from app.db import crud
+from app.db.search import init_search_index
+from app.db.session import Base, SessionLocal
+
+
+def test_search_prefix_ranked_and_paginated(client, auth_headers, create_item):
+    tag = f"zq{uuid.uuid4().hex[:8]}"
+    for i in range(3):
+        create_item(sku=f"{tag}-{i}", name=f"Gadget {i}")
+    renamed = create_item(sku=f"OTHER-{uuid.uuid4().hex[:8]}", name=f"{tag} lamp")
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": tag[:6], "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/v1/items/search", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 4
+    assert seen[-1] == renamed["id"]  # sku hits rank above name hits
+
+    # The index follows updates and deletes.
+    client.patch(
+        f"/v1/items/{renamed['id']}",
+        json={"name": "Plain lamp", "category": "search", "quantity": 1, "price": 1.0, "is_active": True},
+        headers=auth_headers,
+    )
+    response = client.get("/v1/items/search", params={"q": f"{tag} lamp"}, headers=auth_headers)
+    assert response.json()["items"] == []
+
+
+def test_search_uses_fts_index():
+    stmt = crud.search_items_stmt("sqlite", "abc", 20)
+    with SessionLocal() as db:
+        sql = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    assert any("VIRTUAL TABLE INDEX" in row[-1] for row in plan)
+
+
+def test_like_fallback_treats_underscore_literally(create_item):
+    tag = f"zq{uuid.uuid4().hex[:8]}"
+    exact = create_item(sku=f"{tag}_1", name="Underscore")
+    create_item(sku=f"{tag}x1", name="Letter")
+
+    stmt = crud.search_items_stmt("postgresql", f"{tag}_", 20)
+    with SessionLocal() as db:
+        found = [item.id for item, _ in db.execute(stmt).all()]
+    assert found == [exact["id"]]
+
+
+def test_startup_rebuilds_index_after_rowids_move(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.tables["items"].create(engine)
+    init_search_index(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO items (id, sku, name, price) VALUES ('a', 'lamp-1', 'Lamp', 1)"))
+        # What VACUUM or a dump/restore may do: same rows, new rowids.
+        conn.execute(text("UPDATE items SET rowid = rowid + 100"))
+
+    def matches():
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT items.id FROM items_fts JOIN items ON items.rowid = items_fts.rowid "
+                     "WHERE items_fts MATCH 'lamp*'")
+            ).scalars().all()
+
+    assert matches() == []
+    init_search_index(engine)
+    assert matches() == ["a"]
+    engine.dispose()
+
+
+def test_startup_skips_rebuild_when_index_is_in_sync(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.tables["items"].create(engine)
+    init_search_index(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO items (id, sku, name, price) VALUES ('a', 'lamp-1', 'Lamp', 1)"))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    init_search_index(engine)
+    assert not any("'rebuild'" in sql for sql in statements)
+    engine.dispose()
@@ -0,0 +1,92 @@
+import sqlite3
+import time
+import uuid
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db import session
+from app.db.session import configure_sqlite, engine, engine_options
+
+
+def test_sqlite_connections_get_wal_and_pragmas():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+
+
+def test_read_only_engine_leaves_journal_mode_alone(tmp_path):
+    path = tmp_path / "replica.db"
+    create_engine(f"sqlite:///{path}").connect().close()
+
+    replica = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    configure_sqlite(replica, read_only=True)
+    with replica.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+    replica.dispose()
+
+
+def test_server_databases_get_pool_settings():
+    options = engine_options("postgresql://db/inventory")
+    assert options["pool_size"] == settings.db_pool_size
+    assert options["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert "connect_args" not in options
+
+
+def test_cache_fills_use_the_replica_outside_the_write_window(client, auth_headers, monkeypatch, create_item):
+    # The "replica" is the primary behind a counting factory; the URL only
+    # switches on the recent-write markers.
+    used = []
+    name = "AsyncReadSessionLocal" if settings.db_async else "ReadSessionLocal"
+    primary = session.AsyncSessionLocal if settings.db_async else session.SessionLocal
+
+    def replica():
+        used.append(1)
+        return primary()
+
+    monkeypatch.setattr(settings, "read_database_url", "sqlite:///replica.db")
+    monkeypatch.setattr(settings, "read_replica_window_seconds", 0.3)
+    monkeypatch.setattr(session, name, replica)
+
+    url = f"/v1/items/{create_item()['id']}"
+    time.sleep(0.4)  # past the window the create opened
+    assert client.get(url, headers=auth_headers).status_code == 200
+    assert len(used) == 1
+
+    # Just written: item and list fills read the primary.
+    update = {"name": "Widget", "category": "tools", "quantity": 5, "price": 9.5, "is_active": True}
+    client.patch(url, json=update, headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json()["quantity"] == 5
+    list_url = "/v1/items/"
+    client.get(list_url, params={"category": uuid.uuid4().hex}, headers=auth_headers)
+    assert len(used) == 1
+
+    time.sleep(0.4)
+    client.get(list_url, params={"category": uuid.uuid4().hex}, headers=auth_headers)
+    assert len(used) == 2
+
+
+def test_created_items_are_read_from_the_primary_while_the_replica_lags(
+    client, auth_headers, monkeypatch, create_item, tmp_path
+):
+    # The replica is a snapshot of the primary taken before the write.
+    path = tmp_path / "replica.db"
+    with sqlite3.connect(engine.url.database) as primary, sqlite3.connect(path) as replica:
+        primary.backup(replica)
+    if settings.db_async:
+        replica_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        monkeypatch.setattr(session, "AsyncReadSessionLocal", async_sessionmaker(replica_engine, expire_on_commit=False))
+    else:
+        replica_engine = create_engine(f"sqlite:///{path}")
+        monkeypatch.setattr(session, "ReadSessionLocal", sessionmaker(bind=replica_engine, expire_on_commit=False))
+    monkeypatch.setattr(settings, "read_database_url", f"sqlite:///{path}")
+
+    single = create_item()
+    bulk = client.post("/v1/items/bulk", json=[create_item.body()], headers=auth_headers).json()
+
+    for item_id in (single["id"], bulk["results"][0]["id"]):
+        assert client.get(f"/v1/items/{item_id}", headers=auth_headers).status_code == 200
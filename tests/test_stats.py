@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core.config import settings
+from app.db import crud
+from app.db.rollups import init_category_stats
+from app.db.session import Base, SessionLocal
+
+
+def _stats_for(client, headers, category):
+    body = client.get("/v1/items/stats", headers=headers).json()
+    return next((c for c in body["categories"] if c["category"] == category), None)
+
+
+def test_stats_rollups_follow_writes(client, auth_headers, admin_headers):
+    category = f"stats-{uuid.uuid4().hex[:8]}"
+    other = f"{category}-other"
+    ids = []
+    for i, (quantity, price) in enumerate([(2, 10.0), (10, 1.5), (0, 99.0)]):
+        body = {"sku": f"{category}-{i}", "name": "S", "category": category, "quantity": quantity, "price": price}
+        ids.append(client.post("/v1/items", json=body, headers=auth_headers).json()["id"])
+
+    assert _stats_for(client, auth_headers, category) == {
+        "category": category,
+        "item_count": 3,
+        "total_quantity": 12,
+        "stock_value": 35.0,
+        "low_stock_count": 2,
+    }
+
+    # Move one item to another category and restock it, delete another.
+    client.patch(
+        f"/v1/items/{ids[0]}",
+        json={"name": "S", "category": other, "quantity": 20, "price": 10.0, "is_active": True},
+        headers=auth_headers,
+    )
+    client.delete(f"/v1/items/{ids[2]}", headers=admin_headers)
+
+    assert _stats_for(client, auth_headers, category)["item_count"] == 1
+    assert _stats_for(client, auth_headers, other) == {
+        "category": other,
+        "item_count": 1,
+        "total_quantity": 20,
+        "stock_value": 200.0,
+        "low_stock_count": 0,
+    }
+
+
+def test_rollups_match_aggregate_query(client):
+    threshold = settings.low_stock_threshold
+    with SessionLocal() as db:
+        rollups = db.execute(crud.category_stats_stmt("sqlite", threshold)).all()
+        aggregate = db.execute(crud.category_stats_stmt("postgresql", threshold)).all()
+
+    assert len(rollups) == len(aggregate)
+    for rolled, computed in zip(rollups, aggregate):
+        assert rolled[:3] == computed[:3]
+        assert rolled.stock_value == pytest.approx(computed.stock_value)
+        assert rolled.low_stock_count == computed.low_stock_count
+
+
+def test_startup_rebuilds_rollups_only_when_triggers_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "low_stock_threshold", 5)
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables["items"], Base.metadata.tables["category_stats"]])
+    init_category_stats(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO items (id, sku, name, quantity, price) VALUES ('a', 's', 'S', 4, 1)"))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    init_category_stats(engine)
+    assert not any("category_stats" in sql and "DELETE" in sql for sql in statements)
+
+    def low_stock():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT low_stock_count FROM category_stats")).scalar()
+
+    assert low_stock() == 1
+    # A new threshold changes the triggers, so the counts are recomputed.
+    monkeypatch.setattr(settings, "low_stock_threshold", 0)
+    init_category_stats(engine)
+    assert low_stock() == 0
+    engine.dispose()
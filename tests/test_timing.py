@@ -0,0 +1,40 @@
+import uuid
+
+from app.core import timing
+from app.core.config import settings
+
+
+def test_server_timing_header_breaks_down_request(client, auth_headers):
+    response = client.get(f"/v1/items/{uuid.uuid4()}", headers=auth_headers)
+    assert response.status_code == 404
+
+    names = {
+        entry.split(";")[0].strip()
+        for entry in response.headers["Server-Timing"].split(",")
+    }
+    assert {"rate_limit", "cache", "db", "total"} <= names
+
+
+def test_slow_requests_are_sampled_with_spans_and_sql(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "slow_request_ms", 0.001)
+    request_id = uuid.uuid4().hex
+
+    # A fresh category so the list cache cannot answer.
+    client.get(
+        "/v1/items/",
+        params={"category": uuid.uuid4().hex},
+        headers={**auth_headers, "X-Request-ID": request_id},
+    )
+
+    sample = timing.slow_requests[request_id]
+    assert sample["path"] == "/v1/items/"
+    spans = sample["spans"]
+    assert "db" in {span["name"] for span in spans}
+    # Each statement is attributed to the db span it ran under.
+    query = next(q for q in sample["queries"] if q["sql"].lstrip().upper().startswith("SELECT"))
+    assert spans[query["parent"]]["name"] == "db"
+
+
+def test_spans_are_noops_outside_a_request():
+    with timing.span("db"):
+        timing.record_query("SELECT 1", 0.001)